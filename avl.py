@@ -16,12 +16,37 @@ class AVLTree(BinarySearchTree, Generic[K, I]):
         rotations of Adelson-Velsky and Landis (AVL).
     """
 
-    def __init__(self) -> None:
+    def __init__(self, allow_duplicates: bool = False) -> None:
         """
             Initialises an empty Binary Search Tree
+            If allow_duplicates is True, equal keys are stored as separate nodes
+            instead of raising, and kth_largest returns them in the order they
+            were inserted.
             :complexity: O(1)
         """
         BinarySearchTree.__init__(self)
+        self.allow_duplicates = allow_duplicates
+
+    def build_from_sorted(self, keys: list, items: list) -> None:
+        """
+            Replace the contents of the tree with a perfectly balanced tree
+            over keys (in ascending order) and their items, without any
+            comparison or rotation.
+            :complexity: O(N) where N is the length of keys
+        """
+        self.root = self.build_from_sorted_aux(keys, items, 0, len(keys) - 1)
+        self.length = len(keys)
+
+    def build_from_sorted_aux(self, keys: list, items: list, low: int, high: int) -> AVLTreeNode:
+        if low > high:
+            return None
+        mid = (low + high + 1) // 2
+        current = AVLTreeNode(keys[mid], items[mid])
+        current.left = self.build_from_sorted_aux(keys, items, low, mid - 1)
+        current.right = self.build_from_sorted_aux(keys, items, mid + 1, high)
+        current.height = 1 + max(self.get_height(current.left), self.get_height(current.right))
+        current.rightCount = high - mid
+        return current
 
     def get_height(self, current: AVLTreeNode) -> int:
         """
@@ -56,7 +81,8 @@ class AVLTree(BinarySearchTree, Generic[K, I]):
         if current is None:
             current = AVLTreeNode(key, item)
             self.length += 1
-        elif key < current.key:
+        elif key < current.key or (key == current.key and self.allow_duplicates):
+            # A duplicate goes before the equal keys already in the tree, so it ranks after them in kth_largest
             current.left = self.insert_aux(current.left, key, item)
 
         elif key > current.key:
@@ -112,14 +138,31 @@ class AVLTree(BinarySearchTree, Generic[K, I]):
             current.key = temp.key
             current.item = temp.item
 
-            # Delete the successor
-            current.right = self.delete_aux(current.right, temp.key)
+            # Delete the successor, by position rather than by key, since
+            # the right subtree may hold other nodes with an equal key
+            current.right = self.delete_minimal_aux(current.right)
             current.rightCount -= 1
 
         current.height = 1 + max(self.get_height(current.left), self.get_height(current.right))
         current = self.rebalance(current)
         return current
 
+    def delete_minimal_aux(self, current: AVLTreeNode) -> AVLTreeNode:
+        """
+            Deletes the node with the smallest key (the left-most node) of the
+            sub-tree, performing sub-tree rotation whenever it becomes unbalanced.
+            returns the new root of the subtree.
+            :complexity: O(log(N))
+        """
+        if current.left is None:
+            self.length -= 1
+            return current.right
+
+        # rightCount is untouched, nothing is removed on the right
+        current.left = self.delete_minimal_aux(current.left)
+        current.height = 1 + max(self.get_height(current.left), self.get_height(current.right))
+        return self.rebalance(current)
+
     def left_rotate(self, current: AVLTreeNode) -> AVLTreeNode:
         """
             Perform left rotation of the sub-tree.
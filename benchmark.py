@@ -0,0 +1,237 @@
+""" Game Benchmark
+
+Times every Game method on reproducible synthetic workloads and reports, per
+workload size and method:
+
+    calls         number of timed calls
+    ops           items handled by one call (rows, pairs, vendors, budgets...)
+    p50, max      latency of one call, in seconds
+    p99           latency of one call, only with at least MIN_P99_SAMPLES calls (below that it is just the max)
+    throughput    items handled per second over every timed call
+    peak_bytes    peak memory allocated during one extra, untimed call
+
+as JSON. Every p50 or peak_bytes that got worse than the baseline (an earlier
+report, benchmark_baseline.json unless --baseline is given) by more than the
+tolerance is reported as a regression and the exit status is 1:
+
+    python benchmark.py
+    python benchmark.py --sizes 100 1000 --baseline report.json
+    python benchmark.py --sizes 100000 --no-baseline --output report.json
+
+benchmark_baseline.json holds the default sizes with 20 calls per method, it is
+machine dependent: regenerate it with --no-baseline --output after a change of
+hardware or an intended change of performance.
+
+Sizes up to 10^6 work, the largest ones take a while to build and solve.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from game import LAZY_MAX_BUDGETS, Game
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_REPEATS = 20
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Fewer samples than this and the nearest-rank p99 is the largest sample
+MIN_P99_SAMPLES = 100
+# solve_game(mode="kth") is O(M * N), it is only timed up to this size
+KTH_MAX_SIZE = 1000
+POTION_TYPES = ("Health", "Buff", "Damage", "Mana", "Resistance")
+
+
+def make_workload(size: int, seed: int = 0) -> dict:
+    """
+    Synthetic workload of size potions, the same for the same size and seed.
+    Every valuation is profitable and every budget runs out before the valued stock does.
+    :complexity: O(N) where N is size
+    """
+    rand = random.Random(seed)
+    names = ["Potion of " + str(x) for x in range(size)]
+    # the stock is keyed by buy price, so prices are distinct
+    prices = [x / 4 for x in rand.sample(range(4, 40 * size), size)]
+    quantities = [rand.randint(2, 20) for _ in range(size)]
+    delta = max(1, size // 10)
+    valued = rand.sample(range(size), max(1, size // 2))
+    valuations = [(names[x], prices[x] + rand.randint(1, 50)) for x in valued]
+    valued_cost = sum(prices[x] * quantities[x] for x in valued)
+    return {
+        "potion_data": [[POTION_TYPES[x % len(POTION_TYPES)], names[x], prices[x]] for x in range(size)],
+        "inventory": [(names[x], quantities[x]) for x in range(size)],
+        "restock": [(names[rand.randrange(size)], rand.randint(1, 5)) for _ in range(delta)],
+        "withdraw": [(names[rand.randrange(size)], 1) for _ in range(delta)],
+        "vendors": delta,
+        "valuations": valuations,
+        "valuation_updates": [(names[x], prices[x] + rand.randint(1, 50)) for x in rand.sample(valued, delta // 2 + 1)],
+        "budgets": [rand.randint(0, int(valued_cost / 2)) for _ in range(size)],
+    }
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of samples.
+    :complexity: O(S * log(S)) where S is the number of samples
+    """
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def time_method(ops: int, run, setup=None, repeats: int = DEFAULT_REPEATS) -> dict:
+    """
+    Time repeats calls of run, each one preceded by an untimed setup, then measure the peak memory of one more call.
+    """
+    latencies = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    run()
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    timing = {
+        "calls": repeats,
+        "ops": ops,
+        "p50": percentile(latencies, 0.5),
+        "max": max(latencies),
+        "throughput": ops * repeats / total if total > 0 else float("inf"),
+        "peak_bytes": peak_bytes,
+    }
+    if repeats >= MIN_P99_SAMPLES:
+        timing["p99"] = percentile(latencies, 0.99)
+    return timing
+
+
+def benchmark_size(size: int, repeats: int = DEFAULT_REPEATS, seed: int = 0) -> dict[str, dict]:
+    """
+    Time every Game method on the workload of the given size. Methods run in an order where each one
+    leaves the game ready for the next, like a day of the game would.
+    """
+    work = make_workload(size, seed)
+    g = Game(seed=seed)
+    results = {}
+
+    results["set_total_potion_data"] = time_method(
+        size, lambda: g.set_total_potion_data(work["potion_data"]), repeats=repeats)
+    results["add_potions_to_inventory"] = time_method(
+        size, lambda: g.add_potions_to_inventory(work["inventory"]), repeats=repeats)
+    results["restock"] = time_method(
+        len(work["restock"]), lambda: g.restock(work["restock"]), repeats=repeats)
+    # put back what was withdrawn, so every call withdraws from the same stock
+    results["withdraw"] = time_method(
+        len(work["withdraw"]), lambda: g.withdraw(work["withdraw"]),
+        setup=lambda: g.restock(work["withdraw"]), repeats=repeats)
+    results["choose_potions_for_vendors"] = time_method(
+        work["vendors"], lambda: g.choose_potions_for_vendors(work["vendors"]), repeats=repeats)
+
+    results["solve_game[prefix]"] = time_method(
+        size, lambda: g.solve_game(work["valuations"], work["budgets"], mode="prefix"), repeats=repeats)
+    # a single query, the case the heap solver is picked for
+    few_budgets = work["budgets"][:LAZY_MAX_BUDGETS]
+    results["solve_game[heap]"] = time_method(
+        len(few_budgets), lambda: g.solve_game(work["valuations"], few_budgets, mode="heap"), repeats=repeats)
+    if size <= KTH_MAX_SIZE:
+        results["solve_game[kth]"] = time_method(
+            size, lambda: g.solve_game(work["valuations"], work["budgets"], mode="kth"), repeats=repeats)
+
+    for name, price in work["valuations"]:
+        g.update_valuation(name, price)
+
+    def update_valuations() -> None:
+        for name, price in work["valuation_updates"]:
+            g.update_valuation(name, price)
+
+    results["update_valuation"] = time_method(len(work["valuation_updates"]), update_valuations, repeats=repeats)
+    # the first solve after a change builds the budget curve again, that is the cost being measured
+    name, price = work["valuation_updates"][0]
+    results["solve_valuations"] = time_method(
+        size, lambda: g.solve_valuations(work["budgets"]),
+        setup=lambda: g.update_valuation(name, price), repeats=repeats)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game.bin")
+        results["save"] = time_method(size, lambda: g.save(path), repeats=repeats)
+        results["load"] = time_method(size, lambda: Game.load(path), repeats=repeats)
+    return results
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeats: int = DEFAULT_REPEATS, seed: int = 0) -> dict:
+    """
+    Benchmark every size, returning a JSON-ready report.
+    """
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "repeats": repeats,
+                 "seed": seed},
+        "results": {str(size): benchmark_size(size, repeats, seed) for size in sizes},
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float = 0.25) -> list[tuple]:
+    """
+    Returns (size, method, metric, baseline value, current value) for every p50 or peak_bytes of report that is worse
+    than in baseline by more than tolerance (a fraction). Sizes and methods missing from either report are skipped.
+    """
+    regressions = []
+    for size, methods in report["results"].items():
+        for method, current in methods.items():
+            previous = baseline.get("results", {}).get(size, {}).get(method)
+            if previous is None:
+                continue
+            for metric in ("p50", "peak_bytes"):
+                if current[metric] > previous[metric] * (1 + tolerance):
+                    regressions.append((size, method, metric, previous[metric], current[metric]))
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Game methods on synthetic workloads.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="workload sizes (number of potions), up to 10^6")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="timed calls per method and size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="JSON report to compare against")
+    parser.add_argument("--no-baseline", action="store_true", help="do not compare against any baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown or memory growth over the baseline, as a fraction")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.repeats, args.seed)
+    text = json.dumps(report, indent=2)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.no_baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    for size, method, metric, previous, current in regressions:
+        print("regression: size " + size + ", " + method + ", " + metric + ": " + str(previous) + " -> " +
+              str(current), file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -53,6 +53,41 @@ class BSTInOrderIterator:
         return result.key
 
 
+class BSTDescendingNodeIterator:
+    """ Reverse in-order iterator for the binary search tree.
+        Performs stack-based BST traversal, yielding nodes from the largest
+        key to the smallest.
+    """
+
+    def __init__(self, root: TreeNode[K, I]) -> None:
+        """ Iterator initialiser. """
+
+        self.stack = LinkedStack()
+        self.current = root
+
+    def __iter__(self) -> BSTDescendingNodeIterator:
+        """ Standard __iter__() method for initialisers. Returns itself. """
+
+        return self
+
+    def __next__(self) -> TreeNode[K, I]:
+        """ The main body of the iterator.
+            Returns nodes of the BST one by one respecting the reverse in-order.
+        """
+
+        while self.current:
+            self.stack.push(self.current)
+            self.current = self.current.right
+
+        if self.stack.is_empty():
+            raise StopIteration
+
+        result = self.stack.pop()
+        self.current = result.left
+
+        return result
+
+
 class BinarySearchTree(Generic[K, I]):
     """ Basic binary search tree. """
 
@@ -93,6 +128,13 @@ class BinarySearchTree(Generic[K, I]):
         """ Create an in-order iterator. """
         return BSTInOrderIterator(self.root)
 
+    def iter_nodes_descending(self) -> BSTDescendingNodeIterator:
+        """
+            Create an iterator over the nodes, largest key first.
+            :complexity: O(N) to exhaust, where N is the number of nodes
+        """
+        return BSTDescendingNodeIterator(self.root)
+
     def __getitem__(self, key: K) -> I:
         """
             Attempts to get an item in the tree, it uses the Key to attempt to find it
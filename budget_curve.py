@@ -0,0 +1,187 @@
+""" Budget Curve ADT
+
+Ranks the profitable potions of a valuation set once and keeps cumulative
+cost and revenue arrays over that ranking, so that the revenue for any amount
+of starting money is a binary search plus a fractional top-up.
+
+The curve is piecewise linear with a breakpoint at every cumulative cost, and
+is independent of the Game it came from: it can be inverted (budget needed for
+a revenue) and serialised with to_dict/from_dict.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import time
+from bisect import bisect_left, bisect_right
+
+from avl import AVLTree
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, revenue_many falls back to the pure Python loop
+    np = None
+
+
+class BudgetCurve:
+    """
+    Budget Curve
+
+    Potions are stored from the most to the least profitable one.
+
+    attributes:
+        cumulative_cost: cumulative_cost[i] is the money needed to clear the first i potions
+        cumulative_revenue: cumulative_revenue[i] is the money made selling the first i potions
+        costs: cost of clearing the stock of each potion
+        quantities: litres available of each potion
+        sell_prices: price per litre paid by the adventurers for each potion
+    """
+
+    def __init__(self) -> None:
+        self.cumulative_cost = [0]
+        self.cumulative_revenue = [0]
+        self.costs = []
+        self.quantities = []
+        self.sell_prices = []
+
+    @classmethod
+    def from_profit_map(cls, profit_map: AVLTree) -> BudgetCurve:
+        """
+        Build the curve from an AVL tree with K = (profit per litre, -buy price), I = Potion,
+        visiting the potions from the largest profit to the smallest.
+        :complexity: O(N) where N is the number of nodes in profit_map
+        """
+        curve = cls()
+        for node in profit_map.iter_nodes_descending():
+            pot = node.item
+            curve.append(pot.quantity, pot.buy_price, node.key[0] + pot.buy_price)
+        return curve
+
+    def __len__(self) -> int:
+        """
+        Returns the number of potions on the curve
+        :complexity: O(1)
+        """
+        return len(self.costs)
+
+    def append(self, quantity: float, buy_price: float, sell_price: float) -> None:
+        """
+        Add the next (less profitable) potion to the end of the curve
+        :complexity: O(1)
+        """
+        total_cost = quantity * buy_price
+        self.costs.append(total_cost)
+        self.quantities.append(quantity)
+        self.sell_prices.append(sell_price)
+        self.cumulative_cost.append(self.cumulative_cost[-1] + total_cost)
+        self.cumulative_revenue.append(self.cumulative_revenue[-1] + sell_price * quantity)
+
+    def revenue(self, budget: float) -> float:
+        """
+        Money made by spending budget on the most profitable potions first
+        :complexity: O(log(N)) where N is the number of potions on the curve
+        """
+        # Number of potions whose whole stock can be bought
+        i = max(bisect_right(self.cumulative_cost, budget) - 1, 0)
+        revenue = self.cumulative_revenue[i]
+        # Spend whatever is left on a fraction of the next potion
+        if i < len(self.costs):
+            capable_amount = ((budget - self.cumulative_cost[i]) / self.costs[i]) * self.quantities[i]
+            revenue += capable_amount * self.sell_prices[i]
+        return revenue
+
+    def budget_for(self, target_revenue: float) -> float:
+        """
+        Smallest budget whose revenue() is target_revenue, the inverse of revenue()
+        :complexity: O(log(N)) where N is the number of potions on the curve
+        :raises ValueError: when target_revenue is more than clearing every potion makes
+        """
+        if target_revenue <= 0:
+            return 0
+        # First breakpoint making at least target_revenue, the target is on the segment that ends there
+        i = bisect_left(self.cumulative_revenue, target_revenue)
+        if i == len(self.cumulative_revenue):
+            raise ValueError("Revenue " + str(target_revenue) + " is above the maximum of " +
+                             str(self.cumulative_revenue[-1]))
+        segment_revenue = self.quantities[i - 1] * self.sell_prices[i - 1]
+        return self.cumulative_cost[i - 1] + (
+                (target_revenue - self.cumulative_revenue[i - 1]) / segment_revenue) * self.costs[i - 1]
+
+    def breakpoints(self) -> list[tuple[float, float]]:
+        """
+        Returns the (budget, revenue) corners of the curve, revenue is linear between two of them
+        and flat after the last one
+        :complexity: O(N) where N is the number of potions on the curve
+        """
+        return list(zip(self.cumulative_cost, self.cumulative_revenue))
+
+    def to_dict(self) -> dict:
+        """
+        JSON-ready form of the curve, see from_dict
+        :complexity: O(N) where N is the number of potions on the curve
+        """
+        return {"costs": list(self.costs), "quantities": list(self.quantities), "sell_prices": list(self.sell_prices)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> BudgetCurve:
+        """
+        Rebuild a curve from to_dict. The cumulative arrays are summed again in the same order,
+        so the copy answers exactly like the original.
+        :complexity: O(N) where N is the number of potions on the curve
+        """
+        curve = cls()
+        for total_cost, quantity, sell_price in zip(data["costs"], data["quantities"], data["sell_prices"]):
+            curve.costs.append(total_cost)
+            curve.quantities.append(quantity)
+            curve.sell_prices.append(sell_price)
+            curve.cumulative_cost.append(curve.cumulative_cost[-1] + total_cost)
+            curve.cumulative_revenue.append(curve.cumulative_revenue[-1] + sell_price * quantity)
+        return curve
+
+    def revenue_many(self, budgets):
+        """
+        Vectorised revenue() over a whole array of budgets.
+        Returns a NumPy array when NumPy is installed, otherwise a list.
+        :complexity: O(N + M * log(N)) where M is the number of budgets
+        """
+        if np is None:
+            return [self.revenue(budget) for budget in budgets]
+
+        budgets = np.asarray(budgets, dtype=float)
+        cumulative_cost = np.asarray(self.cumulative_cost, dtype=float)
+        cumulative_revenue = np.asarray(self.cumulative_revenue, dtype=float)
+        # Pad with a zero-revenue potion so budgets that clear the whole stock top up nothing
+        costs = np.append(np.asarray(self.costs, dtype=float), 1.0)
+        quantities = np.append(np.asarray(self.quantities, dtype=float), 0.0)
+        sell_prices = np.append(np.asarray(self.sell_prices, dtype=float), 0.0)
+
+        i = np.maximum(np.searchsorted(cumulative_cost, budgets, side="right") - 1, 0)
+        return cumulative_revenue[i] + ((budgets - cumulative_cost[i]) / costs[i]) * quantities[i] * sell_prices[i]
+
+
+if __name__ == '__main__':
+    from game import Game
+
+    num_potions = 2000
+    g = Game()
+    g.set_total_potion_data([["Buff", "Potion of " + str(x), x] for x in range(1, num_potions + 1)])
+    g.add_potions_to_inventory([("Potion of " + str(x), x % 9 + 1) for x in range(1, num_potions + 1)])
+    valuations = [("Potion of " + str(x), x + (x * 37) % 101 + 1) for x in range(1, num_potions + 1)]
+    # Every budget runs out before the last potion
+    budgets = [(x * 7919) % 100000 for x in range(20000)]
+
+    start = time.perf_counter()
+    g.solve_game(valuations, budgets[:200])
+    kth_time = (time.perf_counter() - start) * len(budgets) / 200
+    print("kth_largest solver (extrapolated):", round(kth_time, 3), "s")
+
+    for size in [len(budgets), 10 ** 6]:
+        sweep = budgets * (size // len(budgets))
+        start = time.perf_counter()
+        g.solve_game(valuations, sweep, mode="prefix")
+        print("prefix solver,", size, "budgets:", round(time.perf_counter() - start, 3), "s")
+
+        start = time.perf_counter()
+        g.solve_game_vectorized(valuations, sweep if np is None else np.asarray(sweep))
+        print("vectorised solver (NumPy " + ("missing" if np is None else "installed") + "),", size, "budgets:",
+              round(time.perf_counter() - start, 3), "s")
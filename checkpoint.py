@@ -0,0 +1,226 @@
+""" Game Checkpoints
+
+Compact, versioned binary snapshot of a Game: its catalog (laid out exactly as
+in the hash table), the quantities and order of the stock, the valuation book
+and the position of the RandomGen.
+
+Layout (little-endian), every section follows the previous one:
+
+    header        HEADER
+    types         TYPE_RECORD per distinct potion type
+    catalog       POTION_RECORD per hash table entry, slot is its position in the table
+    detached      POTION_RECORD per stock potion that is no longer in the catalog
+    stock         STOCK_RECORD per stock potion in ascending price order,
+                  i >= 0 is catalog[i], i < 0 is detached[-i - 1]
+    book          BOOK_RECORD per valuation, ranked ones first in ascending ranking order
+    strings       UTF-8 names and types, referred to by (offset, length)
+
+Loading memory-maps the file, puts every potion straight back into its hash
+table slot with its saved hash code and builds the AVL trees from their sorted
+order, so no name is hashed or probed and no rotation happens.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import mmap
+import os
+import struct
+
+from avl import AVLTree
+from hash_table import DEFAULT_MAX_LOAD_FACTOR, LinearProbePotionTable
+from potion import Potion
+from robin_hood_table import RobinHoodPotionTable
+
+CHECKPOINT_MAGIC = b"PBGS"
+CHECKPOINT_VERSION = 2
+
+# magic, version, flags, seed, random state, table size, max potions, conflict count, probe total, probe max,
+# number of types, catalog potions, detached potions, stock potions, valuations, size of the strings section
+HEADER = struct.Struct("<4sHHqQIIQQQIIIIIQ")
+# string offset, string length
+TYPE_RECORD = struct.Struct("<II")
+# slot, buy price, quantity, type index, name offset, name length, value flags,
+# hash code of the name in the table (see LinearProbePotionTable.hash_code, 0 for detached potions)
+POTION_RECORD = struct.Struct("<IddIIIBQ")
+STOCK_RECORD = struct.Struct("<i")
+# name offset, name length, price, value flags, catalog index of a ranked potion (-1 otherwise)
+BOOK_RECORD = struct.Struct("<IIdBi")
+
+# header flags
+GOOD_HASH = 1
+HAS_TABLE = 2
+HAS_STOCK = 4
+ROBIN_HOOD_TABLE = 8  # the table_class of the game is RobinHoodPotionTable, not LinearProbePotionTable
+# value flags, so integer prices and quantities come back as integers
+INT_PRICE = 1
+INT_QUANTITY = 2
+RANKED = 4
+
+
+def value_flags(price, quantity=0.0) -> int:
+    return (INT_PRICE if isinstance(price, int) else 0) | (INT_QUANTITY if isinstance(quantity, int) else 0)
+
+
+class StringPool:
+    """ Strings section being written, each distinct string is stored once. """
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.offsets = {}
+
+    def add(self, text: str) -> tuple[int, int]:
+        if text not in self.offsets:
+            encoded = text.encode("utf-8")
+            self.offsets[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return self.offsets[text]
+
+
+def save_game(game, path: str) -> None:
+    """
+    Write a checkpoint of game to path.
+    :complexity: O(T + C + V) where T is the hash table size, C the stock size and V the size of the valuation book
+    """
+    strings = StringPool()
+    types = []
+    type_index = {}
+    flags = ROBIN_HOOD_TABLE if issubclass(game.table_class, RobinHoodPotionTable) else 0
+
+    def potion_record(pot: Potion, slot: int, hash_code: int = 0) -> bytes:
+        if pot.potion_type not in type_index:
+            type_index[pot.potion_type] = len(types)
+            types.append(TYPE_RECORD.pack(*strings.add(pot.potion_type)))
+        name_offset, name_length = strings.add(pot.name)
+        return POTION_RECORD.pack(slot, pot.buy_price, pot.quantity, type_index[pot.potion_type],
+                                  name_offset, name_length, value_flags(pot.buy_price, pot.quantity), hash_code)
+
+    table = game.hash_table
+    catalog = []
+    catalog_index = {}  # K = id(Potion), I = index in catalog
+    if table is not None:
+        flags |= HAS_TABLE | (GOOD_HASH if table.good_hash else 0)
+        for slot in range(len(table.table)):
+            if table.table[slot] is not None:
+                pot = table.table[slot][1]
+                catalog_index[id(pot)] = len(catalog)
+                catalog.append(potion_record(pot, slot, table.hash_code(pot.name)))
+
+    detached = []
+    stock = []
+    if game.stock is not None:
+        flags |= HAS_STOCK
+        for node in reversed(list(game.stock.iter_nodes_descending())):
+            if id(node.item) in catalog_index:
+                stock.append(STOCK_RECORD.pack(catalog_index[id(node.item)]))
+            else:
+                stock.append(STOCK_RECORD.pack(-len(detached) - 1))
+                detached.append(potion_record(node.item, 0))
+
+    book = []
+    for node in reversed(list(game.valuation_ranking.iter_nodes_descending())):
+        pot, price = node.item
+        book.append(BOOK_RECORD.pack(*strings.add(pot.name), price, value_flags(price) | RANKED,
+                                     catalog_index[id(pot)]))
+    for name in game.valuations:
+        price, key = game.valuations[name]
+        if key is None:
+            book.append(BOOK_RECORD.pack(*strings.add(name), price, value_flags(price), -1))
+
+    header = HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, flags, game.rand.seed, game.rand.getstate(),
+                         len(table.table) if table is not None else 0, table.max_potions if table is not None else 0,
+                         *(table.statistics() if table is not None else (0, 0, 0)),
+                         len(types), len(catalog), len(detached), len(stock), len(book), len(strings.data))
+    with open(path, "wb") as f:
+        f.write(header)
+        for section in [types, catalog, detached, stock, book]:
+            f.write(b"".join(section))
+        f.write(strings.data)
+
+
+def restore_game(game, path: str) -> None:
+    """
+    Replace the state of game with the checkpoint at path.
+    :complexity: O(T + C + V) where T is the hash table size, C the stock size and V the size of the valuation book
+    :raises ValueError: when path is not a checkpoint this version can read, or is shorter than its header says
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:  # also keeps empty files away from mmap
+            raise ValueError("Not a game checkpoint: " + str(path))
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with buffer:
+        (magic, version, flags, seed, random_state, table_size, max_potions, conflict_count, probe_total, probe_max,
+         num_types, num_catalog, num_detached, num_stock, num_book, strings_size) = HEADER.unpack_from(buffer, 0)
+        if magic != CHECKPOINT_MAGIC:
+            raise ValueError("Not a game checkpoint: " + str(path))
+        if version != CHECKPOINT_VERSION:
+            raise ValueError("Unsupported checkpoint version " + str(version))
+
+        layout = [(TYPE_RECORD, num_types), (POTION_RECORD, num_catalog), (POTION_RECORD, num_detached),
+                  (STOCK_RECORD, num_stock), (BOOK_RECORD, num_book)]
+        if len(buffer) < HEADER.size + sum(record.size * count for record, count in layout) + strings_size:
+            raise ValueError("Truncated game checkpoint: " + str(path))
+
+        offset = HEADER.size
+        sections = []
+        for record, count in layout:
+            sections.append(record.iter_unpack(buffer[offset:offset + record.size * count]))
+            offset += record.size * count
+        strings = buffer[offset:offset + strings_size]
+        type_records, catalog_records, detached_records, stock_records, book_records = sections
+
+        def string(string_offset: int, length: int) -> str:
+            return strings[string_offset:string_offset + length].decode("utf-8")
+
+        types = [string(string_offset, length) for string_offset, length in type_records]
+
+        def potion(record: tuple) -> tuple[int, Potion, int]:  # or whichever potion_class the game uses
+            slot, price, quantity, type_i, name_offset, name_length, value, hash_code = record
+            return slot, game.potion_class(types[type_i], string(name_offset, name_length),
+                                           int(price) if value & INT_PRICE else price,
+                                           int(quantity) if value & INT_QUANTITY else quantity), hash_code
+
+        game.rand.seed = seed
+        game.rand.setstate(random_state)
+
+        catalog = [potion(record) for record in catalog_records]
+        game.table_class = RobinHoodPotionTable if flags & ROBIN_HOOD_TABLE else LinearProbePotionTable
+        game.hash_table = None
+        if flags & HAS_TABLE:
+            # Same size as the saved table, and it still grows like the one set_total_potion_data builds
+            table = game.table_class(max_potions, bool(flags & GOOD_HASH), table_size, DEFAULT_MAX_LOAD_FACTOR)
+            for slot, pot, hash_code in catalog:  # straight into their slots, no hashing or probing
+                table.table[slot] = (pot.name, pot)
+                table.hash_codes[pot.name] = hash_code
+                if flags & ROBIN_HOOD_TABLE:  # distance from its home slot, O(1) from the saved hash code
+                    table.distance[slot] = (slot - hash_code % table_size) % table_size
+            table.count = len(catalog)
+            table.conflict_count, table.probe_total, table.probe_max = conflict_count, probe_total, probe_max
+            game.hash_table = table
+
+        detached = [potion(record)[1] for record in detached_records]
+        game.stock = None
+        if flags & HAS_STOCK:
+            items = [catalog[i][1] if i >= 0 else detached[-i - 1] for (i,) in stock_records]
+            game.stock = AVLTree()
+            game.stock.build_from_sorted([pot.buy_price for pot in items], items)
+
+        game.valuations = {}
+        ranked_keys = []
+        ranked_items = []
+        for name_offset, name_length, price, value, i in book_records:
+            name = string(name_offset, name_length)
+            if value & INT_PRICE:
+                price = int(price)
+            key = None
+            if value & RANKED:
+                pot = catalog[i][1]
+                key = (price - pot.buy_price, -pot.buy_price)
+                ranked_keys.append(key)
+                ranked_items.append((pot, price))
+            game.valuations[name] = (price, key)
+        game.valuation_ranking = AVLTree()
+        game.valuation_ranking.build_from_sorted(ranked_keys, ranked_items)
+
+    game.valuation_curve = None
+    game.inventory_version += 1
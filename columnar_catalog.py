@@ -0,0 +1,195 @@
+""" Columnar Potion Catalog
+
+Keeps a potion catalog as parallel typed arrays (struct-of-arrays) indexed by
+a dense potion id, instead of one Potion object per potion:
+
+    names[id]        potion name
+    type_codes[id]   index into types, every distinct potion type is stored once
+    buy_prices[id]   price per litre from the vendors
+    quantities[id]   litres in stock
+
+PotionView wraps an id so callers that need a Potion can still read and set
+potion_type, name, buy_price and quantity. The solver reads the arrays directly.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from array import array
+
+from budget_curve import BudgetCurve
+
+
+class PotionView:
+    """ Potion-like view of one potion of a ColumnarCatalog. """
+
+    __slots__ = ("catalog", "id")
+
+    def __init__(self, catalog: ColumnarCatalog, potion_id: int) -> None:
+        self.catalog = catalog
+        self.id = potion_id
+
+    @property
+    def potion_type(self) -> str:
+        return self.catalog.types[self.catalog.type_codes[self.id]]
+
+    @property
+    def name(self) -> str:
+        return self.catalog.names[self.id]
+
+    @property
+    def buy_price(self) -> float:
+        return self.catalog.buy_prices[self.id]
+
+    @property
+    def quantity(self) -> float:
+        return self.catalog.quantities[self.id]
+
+    @quantity.setter
+    def quantity(self, value: float) -> None:
+        self.catalog.quantities[self.id] = value
+
+    def __str__(self) -> str:
+        return "Name: " + str(self.name) + ", Type: " + str(self.potion_type) + ", Quantity: " + str(
+            self.quantity) + ",Price: " + str(self.buy_price)
+
+
+class ColumnarCatalog:
+    """
+    Columnar Potion Catalog
+
+    attributes:
+        names: potion names, by id
+        type_codes: index into types, by id
+        buy_prices: buy prices, by id
+        quantities: quantities, by id
+        types: distinct potion types
+        type_index: K = potion type, I = index in types
+        ids: K = potion name, I = id
+    """
+
+    def __init__(self) -> None:
+        self.names = []
+        self.type_codes = array("I")
+        self.buy_prices = array("d")
+        self.quantities = array("d")
+        self.types = []
+        self.type_index = {}
+        self.ids = {}
+
+    @classmethod
+    def from_potion_data(cls, potion_data) -> ColumnarCatalog:
+        """
+        Build a catalog from [potion type, name, buy price] rows, as given to Game.set_total_potion_data
+        :complexity: O(N) where N is the number of rows
+        """
+        catalog = cls()
+        for pot_type, name, price in potion_data:
+            catalog.add(pot_type, name, price)
+        return catalog
+
+    def __len__(self) -> int:
+        """
+        Returns the number of potions in the catalog
+        :complexity: O(1)
+        """
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.ids
+
+    def __getitem__(self, name: str) -> PotionView:
+        """
+        :raises KeyError: when the potion is not in the catalog
+        """
+        return PotionView(self, self.ids[name])
+
+    def add(self, potion_type: str, name: str, buy_price: float) -> int:
+        """
+        Add a potion with no stock and return its id. Adding a known name updates it in place.
+        :complexity: O(1) amortised
+        """
+        if potion_type not in self.type_index:
+            self.type_index[potion_type] = len(self.types)
+            self.types.append(potion_type)
+        if name in self.ids:
+            potion_id = self.ids[name]
+            self.type_codes[potion_id] = self.type_index[potion_type]
+            self.buy_prices[potion_id] = buy_price
+            return potion_id
+        potion_id = len(self.names)
+        self.ids[name] = potion_id
+        self.names.append(name)
+        self.type_codes.append(self.type_index[potion_type])
+        self.buy_prices.append(buy_price)
+        self.quantities.append(0.0)
+        return potion_id
+
+    def view(self, potion_id: int) -> PotionView:
+        return PotionView(self, potion_id)
+
+    def restock(self, potion_name_amount_pairs) -> None:
+        """
+        Add quantities to known potions, unknown names are skipped like in Game.add_potions_to_inventory
+        :complexity: O(D) where D is the number of pairs
+        """
+        for name, amount in potion_name_amount_pairs:
+            if name in self.ids:
+                self.quantities[self.ids[name]] += amount
+
+    def budget_curve(self, potion_valuations) -> BudgetCurve:
+        """
+        Budget curve of a valuation list, ranked the same way as Game.build_profit_map:
+        most profitable first, ties going to the cheaper potion.
+        :complexity: O(N * log(N)) where N is the length of potion_valuations
+        """
+        buy_prices = self.buy_prices
+        ranking = []
+        for name, price in potion_valuations:
+            if name in self.ids:
+                potion_id = self.ids[name]
+                profit = price - buy_prices[potion_id]
+                if profit > 0:
+                    ranking.append((profit, -buy_prices[potion_id], potion_id))
+        ranking.sort(reverse=True)
+
+        curve = BudgetCurve()
+        quantities = self.quantities
+        for profit, negative_price, potion_id in ranking:
+            curve.append(quantities[potion_id], buy_prices[potion_id], profit + buy_prices[potion_id])
+        return curve
+
+    def solve(self, potion_valuations, starting_money) -> list[float]:
+        """
+        Same answers as Game.solve_game(potion_valuations, starting_money, mode="prefix")
+        :complexity: O(N * log(N) + M * log(N)) where M is the length of starting_money
+        """
+        curve = self.budget_curve(potion_valuations)
+        return [round(curve.revenue(money), 1) for money in starting_money]
+
+
+if __name__ == '__main__':
+    import tracemalloc
+
+    from hash_table import LinearProbePotionTable
+    from potion import Potion
+
+    num_potions = 100000
+    rows = [(["Health", "Buff", "Damage"][x % 3], "Potion of " + str(x), x + 0.5) for x in range(num_potions)]
+
+    tracemalloc.start()
+    table = LinearProbePotionTable(num_potions, True, 2 * num_potions)
+    for pot_type, name, price in rows:
+        table.table[len(table)] = (name, Potion.create_empty(pot_type, name, price))  # skip hashing, memory only
+        table.count += 1
+    objects_size = tracemalloc.get_traced_memory()[0]
+    del table
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    columns = ColumnarCatalog.from_potion_data(rows)
+    columns_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print("Potion objects in a hash table:", objects_size // num_potions, "bytes per potion")
+    print("Columnar catalog:", columns_size // num_potions, "bytes per potion")
@@ -0,0 +1,98 @@
+""" Day Pipeline
+
+Streams a history of days through a single Game. Every day is a dictionary of
+events, applied in the order the game is played:
+
+    inventory: list of (potion name, quantity), passed to add_potions_to_inventory
+    restock: list of (potion name, quantity) added to the stock in place
+    withdraw: list of (potion name, quantity) taken out of the stock in place
+    vendors: number of vendors, passed to choose_potions_for_vendors
+    valuation_updates: list of (potion name, price) applied to the valuation book,
+                       a price of None removes the valuation
+    valuations: list of (potion name, price) for solve_game
+    budgets: list of starting money, solved against valuations if the day has
+             them, otherwise against the valuation book
+
+Any event can be left out. The Game (its catalog, AVL stock, valuation book and
+RandomGen) carries over from one day to the next, and restock and withdraw only
+touch the potions they name. Results are yielded one day at a time, so a
+history never has to be held in memory.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import json
+from typing import Iterable, Iterator, TextIO
+
+from game import Game
+
+
+def simulate_days(game: Game, days: Iterable[dict], mode: str = "prefix") -> Iterator[tuple[int, list, list]]:
+    """
+    Play every day of days on game, lazily.
+    Yields (day number, vendor inventory, profits for each starting money).
+    :complexity: O(1) memory on top of the Game, the work per day is that of the Game methods it calls
+    """
+    for day, events in enumerate(days):
+        if "inventory" in events:
+            game.add_potions_to_inventory(events["inventory"])
+        if "restock" in events:
+            game.restock(events["restock"])
+        if "withdraw" in events:
+            game.withdraw(events["withdraw"])
+
+        vendor_inventory = []
+        if events.get("vendors"):
+            vendor_inventory = game.choose_potions_for_vendors(events["vendors"])
+
+        for name, price in events.get("valuation_updates", []):
+            if price is None:
+                game.remove_valuation(name)
+            else:
+                game.update_valuation(name, price)
+
+        profits = []
+        if "budgets" in events:
+            if "valuations" in events:
+                profits = game.solve_game(events["valuations"], events["budgets"], mode=mode)
+            else:
+                profits = game.solve_valuations(events["budgets"])
+
+        yield day, vendor_inventory, profits
+
+
+def read_days(lines: TextIO) -> Iterator[dict]:
+    """
+    Lazily parse a JSON lines history, one day per line. Blank lines are skipped.
+    :complexity: O(L) per day where L is the length of its line
+    """
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+if __name__ == '__main__':
+    G = Game()
+    G.set_total_potion_data([
+        ["Health", "Potion of Health Regeneration", 20],
+        ["Buff", "Potion of Extreme Speed", 10],
+        ["Damage", "Potion of Deadly Poison", 45],
+        ["Health", "Potion of Instant Health", 5],
+        ["Buff", "Potion of Increased Stamina", 25],
+        ["Damage", "Potion of Untenable Odour", 1]
+    ])
+    history = [
+        {"inventory": [("Potion of Health Regeneration", 4), ("Potion of Extreme Speed", 5),
+                       ("Potion of Instant Health", 3), ("Potion of Increased Stamina", 10),
+                       ("Potion of Untenable Odour", 5)],
+         "vendors": 4,
+         "valuation_updates": [("Potion of Health Regeneration", 30), ("Potion of Extreme Speed", 15),
+                               ("Potion of Instant Health", 15), ("Potion of Increased Stamina", 20)],
+         "budgets": [12.5, 45, 80]},
+        {"vendors": 2,
+         "valuation_updates": [("Potion of Instant Health", None)],
+         "budgets": [12.5, 45, 80]},
+    ]
+    for result in simulate_days(G, history):
+        print(result)
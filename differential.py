@@ -0,0 +1,206 @@
+""" Differential Harness
+
+Runs game.Game and game_holder.Game on the same synthetic workloads (see benchmark.make_workload) and reports, per
+workload size and method:
+
+    divergence    how many outputs were compared, how many differ, the largest difference and a few examples
+    digests       a digest of the outputs of each implementation, so two reports tell whether a change altered results
+    timing        p50/max latency and peak memory of each implementation (see benchmark.time_method), and the speedup
+                  of game.py over game_holder.py (holder p50 / game p50)
+
+as JSON:
+
+    python differential.py --sizes 100 1000 --output differential.json
+
+The two solve_game are known to disagree: game_holder.py adds a random epsilon to every profit, sums profits
+rather than revenue, does not round, and zeroes the quantities it buys. Its solve_game also draws the whole profit
+map to stdout, which is sent to os.devnull here and counted in its timing. Since it changes the stock, both implementations get
+a freshly stocked game before every solve_game call.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import sys
+
+import game
+import game_holder
+from benchmark import DEFAULT_SIZES, make_workload, time_method
+
+IMPLEMENTATIONS = {"game": game.Game, "game_holder": game_holder.Game}
+# Budgets per solve_game call, both solvers are O(M * N)
+DEFAULT_MAX_BUDGETS = 100
+EXAMPLES = 5
+
+
+def stocked_game(cls, work: dict, seed: int):
+    """
+    A game of class cls with the catalog and the inventory of work.
+    """
+    g = cls(seed=seed)
+    g.set_total_potion_data(work["potion_data"])
+    g.add_potions_to_inventory(work["inventory"])
+    return g
+
+
+def call_quietly(method, *args):
+    """
+    Call method, throwing away what it prints (game_holder.Game.solve_game draws its profit map).
+    AVLTree.draw binds sys.stdout when it is defined, so the file descriptor itself is sent to os.devnull.
+    """
+    sys.__stdout__.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return method(*args)
+    finally:
+        sys.__stdout__.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+        os.close(devnull)
+
+
+def error_output(error: Exception) -> list[str]:
+    """
+    Output recorded for a call that raised, so that it is compared like any other output.
+    """
+    return ["error: " + type(error).__name__ + ": " + str(error)]
+
+
+def run_outputs(cls, work: dict, budgets: list[int], seed: int) -> dict[str, list]:
+    """
+    Outputs of every compared method of cls on work. Every method runs on a fresh game so the random
+    generators of both implementations are in the same state.
+    """
+    calls = {
+        "stock": lambda g: [key for key in g.stock],
+        "choose_potions_for_vendors": lambda g: g.choose_potions_for_vendors(work["vendors"]),
+        "solve_game": lambda g: call_quietly(g.solve_game, work["valuations"], budgets),
+    }
+    outputs = {}
+    for method, call in calls.items():
+        try:
+            outputs[method] = call(stocked_game(cls, work, seed))
+        except Exception as error:
+            outputs[method] = error_output(error)
+    return outputs
+
+
+def digest(outputs: list) -> str:
+    return hashlib.sha256(json.dumps(outputs).encode()).hexdigest()[:16]
+
+
+def diverge(expected: list, actual: list) -> dict:
+    """
+    Compares two output lists position by position. Outputs are numbers or (name, quantity) pairs,
+    the difference of two numbers is their absolute difference and anything else differs by 1 when it is not equal.
+    :complexity: O(L) where L is the length of the longest list
+    """
+    mismatches = []
+    max_diff = 0
+    for position in range(max(len(expected), len(actual))):
+        left = expected[position] if position < len(expected) else None
+        right = actual[position] if position < len(actual) else None
+        if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+            diff = abs(left - right)
+        else:
+            diff = 0 if left == right else 1
+        if diff > 0:
+            mismatches.append((position, left, right))
+            max_diff = max(max_diff, diff)
+    return {
+        "compared": max(len(expected), len(actual)),
+        "mismatches": len(mismatches),
+        "max_diff": max_diff,
+        "examples": mismatches[:EXAMPLES],
+    }
+
+
+def time_implementation(cls, work: dict, budgets: list[int], repeats: int, seed: int) -> dict[str, dict]:
+    """
+    Time the methods both implementations have, each one as a day of the game would call it.
+    A method that raises gets {"error": ...} instead of its timing.
+    """
+    g = cls(seed=seed)
+    methods = [
+        ("set_total_potion_data", len(work["potion_data"]), lambda: g.set_total_potion_data(work["potion_data"]),
+         None),
+        ("add_potions_to_inventory", len(work["inventory"]), lambda: g.add_potions_to_inventory(work["inventory"]),
+         None),
+        ("choose_potions_for_vendors", work["vendors"], lambda: g.choose_potions_for_vendors(work["vendors"]), None),
+        ("solve_game", len(budgets), lambda: call_quietly(g.solve_game, work["valuations"], budgets),
+         lambda: g.add_potions_to_inventory(work["inventory"])),
+    ]
+    results = {}
+    for method, ops, run, setup in methods:
+        try:
+            results[method] = time_method(ops, run, setup=setup, repeats=repeats)
+        except Exception as error:
+            results[method] = {"error": error_output(error)[0]}
+    return results
+
+
+def compare_size(size: int, repeats: int = 5, seed: int = 0, max_budgets: int = DEFAULT_MAX_BUDGETS) -> dict:
+    work = make_workload(size, seed)
+    budgets = work["budgets"][:max_budgets]
+    outputs = {name: run_outputs(cls, work, budgets, seed) for name, cls in IMPLEMENTATIONS.items()}
+    timings = {name: time_implementation(cls, work, budgets, repeats, seed) for name, cls in IMPLEMENTATIONS.items()}
+    timing = {}
+    for method in timings["game"]:
+        timing[method] = {"game": timings["game"][method], "game_holder": timings["game_holder"][method],
+                          "speedup": None}
+        if "p50" in timings["game"][method] and "p50" in timings["game_holder"][method]:
+            game_p50 = timings["game"][method]["p50"]
+            timing[method]["speedup"] = (timings["game_holder"][method]["p50"] / game_p50 if game_p50 > 0
+                                         else float("inf"))
+    return {
+        "divergence": {method: diverge(outputs["game"][method], outputs["game_holder"][method])
+                       for method in outputs["game"]},
+        "digests": {name: {method: digest(outputs[name][method]) for method in outputs[name]} for name in outputs},
+        "timing": timing,
+    }
+
+
+def run_comparison(sizes=DEFAULT_SIZES, repeats: int = 5, seed: int = 0,
+                   max_budgets: int = DEFAULT_MAX_BUDGETS) -> dict:
+    """
+    Compare both implementations at every size, returning a JSON-ready report.
+    """
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "repeats": repeats,
+                 "seed": seed, "max_budgets": max_budgets},
+        "results": {str(size): compare_size(size, repeats, seed, max_budgets) for size in sizes},
+    }
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare game.py and game_holder.py on synthetic workloads.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="workload sizes (number of potions)")
+    parser.add_argument("--repeats", type=int, default=5, help="timed calls per method and size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-budgets", type=int, default=DEFAULT_MAX_BUDGETS,
+                        help="starting money values per solve_game call")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    text = json.dumps(run_comparison(args.sizes, args.repeats, args.seed, args.max_budgets), indent=2)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
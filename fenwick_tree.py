@@ -0,0 +1,71 @@
+""" Fenwick Tree ADT
+
+Defines a Fenwick (binary indexed) tree of counts over the positions 1..size.
+Counts are kept in a dictionary, so a tree only uses memory for the positions
+that have been touched, and creating one is O(1) whatever its size.
+"""
+__docformat__ = 'reStructuredText'
+
+
+class FenwickTree:
+    """
+    Fenwick Tree
+
+    attributes:
+        size: number of positions
+        tree: tree[i] is the sum of the counts in (i - lowbit(i), i]
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Initialises a tree with a count of 0 at every position
+        :complexity: O(1)
+        """
+        self.size = size
+        self.tree = {}
+
+    def add(self, position: int, value: int = 1) -> None:
+        """
+        Add value to the count at position
+        :complexity: O(log(N)) where N is the size
+        :raises IndexError: when position is not in 1..size
+        """
+        if position < 1 or position > self.size:
+            raise IndexError("Position " + str(position) + " is out of range")
+        while position <= self.size:
+            self.tree[position] = self.tree.get(position, 0) + value
+            position += position & -position
+
+    def prefix_sum(self, position: int) -> int:
+        """
+        Sum of the counts at positions 1..position
+        :complexity: O(log(N)) where N is the size
+        """
+        result = 0
+        while position > 0:
+            result += self.tree.get(position, 0)
+            position -= position & -position
+        return result
+
+    def kth_free(self, k: int) -> int:
+        """
+        Returns the k-th position (from 1) whose count is 0, when every count is either 0 or 1.
+        Descends the tree one power of two at a time instead of binary searching over prefix_sum.
+        :complexity: O(log(N)) where N is the size
+        :raises ValueError: when there are fewer than k free positions
+        """
+        if k < 1 or k > self.size - self.prefix_sum(self.size):
+            raise ValueError("There are no " + str(k) + "th free position in the tree")
+        position = 0
+        step = 1
+        while step * 2 <= self.size:
+            step *= 2
+        while step > 0:
+            if position + step <= self.size:
+                # tree[position + step] covers exactly the step positions after position
+                free = step - self.tree.get(position + step, 0)
+                if free < k:
+                    position += step
+                    k -= free
+            step //= 2
+        return position + 1
@@ -1,9 +1,17 @@
 from __future__ import annotations
 # ^ In case you aren't on Python 3.10
+import heapq
+
 from avl import AVLTree
+import checkpoint
+from budget_curve import BudgetCurve
+from fenwick_tree import FenwickTree
+from game_metrics import GameMetrics, instrumented
 from hash_table import LinearProbePotionTable
 from potion import Potion
 from random_gen import RandomGen
+from sensitivity import SensitivityAnalysis
+from solve_cache import SolveCache, valuation_fingerprint
 
 """
 ADT used for my approach.
@@ -19,13 +27,33 @@ undergo deletion, search and insertion processes compared to the standard BST. S
 a good overall runtime complexity for the methods.
 """
 
+# "kth" walks profit_map with kth_largest per potion and per starting money,
+# "prefix" answers each starting money from the cumulative arrays of a BudgetCurve,
+# "heap" heapifies the profitable potions and only pops the ones the starting money can reach,
+# "auto" is "heap" for at most LAZY_MAX_BUDGETS starting money values and "kth" otherwise.
+SOLVER_MODES = ("kth", "prefix", "heap", "auto")
+LAZY_MAX_BUDGETS = 16
+
 
 class Game:
 
-    def __init__(self, seed=0) -> None:
+    def __init__(self, seed=0, potion_class: type = Potion, table_class: type = LinearProbePotionTable) -> None:
         self.rand = RandomGen(seed=seed)
+        # Potion, or a memory compact stand-in from potion.py (CompactPotion, SplitPotion)
+        self.potion_class = potion_class
+        # LinearProbePotionTable, or RobinHoodPotionTable from robin_hood_table.py
+        self.table_class = table_class
         self.stock = None
         self.hash_table = None
+        # Valuation book: K = Potion name, I = (price paid by adventurers, key in valuation_ranking or None)
+        self.valuations = {}
+        # K = (profit, -buy price), I = (Potion, price paid by adventurers), only profitable potions are ranked
+        self.valuation_ranking = AVLTree()
+        self.valuation_curve = None  # BudgetCurve over valuation_ranking, rebuilt lazily after a change
+        # Bumped whenever the catalog or the stock changes, so cached solve_game results never go stale
+        self.inventory_version = 0
+        self.solve_cache = None  # opt-in, see enable_solve_cache
+        self.metrics = None  # opt-in, see enable_metrics
 
     '''
     Since the method has a for loop which iterates through the entire length of list potion_data, and an inner for loop
@@ -34,24 +62,30 @@ class Game:
     Complexity : N(1 + 1 + 1 + 1 + C), ignoring the constants, N* C, hence overall complexity is obtained as per above.
     '''
 
-    def set_total_potion_data(self, potion_data: list) -> None:
-        # Instantiating hash_table using length of potion data
-        self.hash_table = LinearProbePotionTable(len(potion_data))
-        for i in range(len(potion_data)):  # O (N), iterates through length of potion_data
+    @instrumented("set_total_potion_data", lambda game, potion_data, size_hint=-1: len(game.hash_table))
+    def set_total_potion_data(self, potion_data: list, size_hint: int = -1) -> None:
+        # Instantiating hash_table using length of potion data, or size_hint when potion_data is a stream of rows
+        # whose length is not known up front (the table grows past it if needed)
+        self.hash_table = self.table_class(size_hint if size_hint > -1 else len(potion_data))
+        for row in potion_data:  # O (N), iterates through length of potion_data
             # Accessing data in the potion_data list, [Pot_Type, Name, Price]
-            pot_type = potion_data[i][0]  # O(1) array indexing
-            name = potion_data[i][1]  # O(1)  ''''
-            price = potion_data[i][2]  # O(1) ''''
+            pot_type = row[0]  # O(1) array indexing
+            name = row[1]  # O(1)  ''''
+            price = row[2]  # O(1) ''''
             # Creating Potion class to be placed in the hash table
-            pot = Potion.create_empty(pot_type, name, price)  # O(1) recreates class with updated attributes
+            pot = self.potion_class.create_empty(pot_type, name, price)  # O(1) recreates class with updated attributes
             # Inserting Pot object into hash table K = Potion Name, I = Potion object
             self.hash_table[name] = pot  # O(1) as accordance to the functions in hash_table.py
 
         # If potion classes exist , reset potion's quantities to 0
         if self.stock is not None:
-            for j in self.stock:  # O(C) where C is length of potion_name_amount_pairs in function below
+            for j in self.stock.iter_nodes_descending():  # O(C) where C is length of potion_name_amount_pairs in
+                # function below
                 j.item.quantity = 0
 
+        self.inventory_version += 1
+        # The valuation book points at the old Potion objects, rank it again against the new catalog
+        self.rebuild_valuation_ranking()  # O(V * log(V)) where V is the number of valuations in the book
         return
 
     '''
@@ -61,6 +95,7 @@ class Game:
     Complexity : C* (1 + 1 + 1 + 1 +1 +1 + log(N)), so ignoring the constants, C* log(N)
     '''
 
+    @instrumented("add_potions_to_inventory", lambda game, pairs: len(pairs))
     def add_potions_to_inventory(self, potion_name_amount_pairs: list[tuple[str, float]]) -> None:
         self.stock = AVLTree()  # Setting Potion stock to use AVL
         # iterate according to the number of potions provided
@@ -70,48 +105,120 @@ class Game:
             value = potion_name_amount_pairs[i][1]  # ''''
 
             # If current hash table has corresponding pot name, update the quantity accordingly
-            if self.hash_table.__contains__(name):  # O(1) as accordance to the functions in hash_table.py
-                pot = self.hash_table[name]  # Retrieving item from hash map (K = Potion_Name) O(1) searching hash table
+            pot = self.hash_table.get(name)  # O(1) one probe, None when the potion is not in the catalog
+            if pot is not None:
                 pot.quantity = value  # updating quantity, O(1) updating value
                 price = pot.buy_price  # getting the potion's price so that we can create AVL using that as the key,
                 # O(1) updating value
                 self.stock[price] = pot  # creating AVL tree using K = Potion price, I = Potion object , O(log(N))
                 # since insertion/searching using a balanced tree(AVL)
+        self.valuation_curve = None  # quantities changed, O(1)
+        self.inventory_version += 1
         return
 
+    '''
+    restock and withdraw change the quantities of the current stock in place instead of building a new AVL tree.
+    Each pair is one hash table lookup plus at most one AVL search and one AVL insertion/deletion, so the cost is
+    proportional to the size of the delta:
+    O(D * log(C)) where D is the length of potion_name_amount_pairs and C is the number of potions in stock
+    '''
+
+    @instrumented("restock", lambda game, pairs: len(pairs))
+    def restock(self, potion_name_amount_pairs: list[tuple[str, float]]) -> None:
+        if self.stock is None:
+            self.stock = AVLTree()
+        for name, amount in potion_name_amount_pairs:  # O(D)
+            pot = self.hash_table.get(name)  # O(1) one probe, None when the potion is not in the catalog
+            if pot is not None:
+                if self.stock_node(pot) is None:  # O(log(C)) potion is new to the stock
+                    pot.quantity = amount
+                    self.stock[pot.buy_price] = pot  # O(log(C))
+                else:
+                    pot.quantity += amount
+        self.valuation_curve = None
+        self.inventory_version += 1
+
+    @instrumented("withdraw", lambda game, pairs: len(pairs))
+    def withdraw(self, potion_name_amount_pairs: list[tuple[str, float]]) -> None:
+        if self.stock is None:
+            return
+        for name, amount in potion_name_amount_pairs:  # O(D)
+            pot = self.hash_table.get(name)  # O(1) one probe, None when the potion is not in the catalog
+            if pot is not None:
+                if self.stock_node(pot) is not None:  # O(log(C)) nothing to withdraw if it is not in stock
+                    pot.quantity -= amount
+                    if pot.quantity <= 0:  # sold out, remove it from the stock
+                        pot.quantity = 0
+                        del self.stock[pot.buy_price]  # O(log(C))
+        self.valuation_curve = None
+        self.inventory_version += 1
+
+    """
+    Retiring a potion deletes it from the hash table, the stock and the ranking of the valuation book (its price stays
+    in the book, unranked, like any valuation of a potion that is not in the catalog). So per potion:
+    O(1 + log(C) + log(V)) where C is the number of potions in stock and V the size of the valuation book
     """
-    So there are two for loops but they both share the same overall complexity, so we'll just see them individually.
-    In the for loop, there exist a deletion method call through a magic method for the AVL to delete a node.
+
+    @instrumented("retire_potions", lambda game, names: len(names))
+    def retire_potions(self, names: list[str]) -> None:
+        """
+        :raises KeyError: when a potion is not in the catalog, the potions before it are retired
+        """
+        for name in names:
+            pot = self.hash_table[name]  # O(1)
+            if self.stock is not None and self.stock_node(pot) is not None:  # O(log(C))
+                del self.stock[pot.buy_price]  # O(log(C))
+            pot.quantity = 0
+            del self.hash_table[name]  # O(1) expected, see hash_table.py
+            if name in self.valuations:  # O(log(V))
+                self.update_valuation(name, self.valuations[name][0])
+        self.valuation_curve = None
+        self.inventory_version += 1
+
+    def stock_node(self, pot: Potion):
+        """
+        Returns the stock node holding pot, or None if pot is not in stock.
+        A node left behind by an earlier catalog is re-pointed at pot.
+        :complexity: O(log(C))
+        """
+        try:
+            node = self.stock.get_tree_node_by_key(pot.buy_price)
+        except KeyError:
+            return None
+        if node.item is not pot:  # set_total_potion_data replaced the Potion objects
+            node.item.quantity = 0
+            node.item = pot
+            pot.quantity = 0
+        return node
+
+    """
+    One for loop over the number of vendors. Instead of deleting every pick from the AVL tree and inserting it back
+    afterwards, picks are marked in a Fenwick tree over the price ranks of the stock, and the p-th largest potion that
+    has not been picked yet is found by descending that Fenwick tree. The stock is never modified.
     So the overall complexity of the program :
     O(C * log(N))
-    Complexity: (C * (1+1+log(N) + 1 + 1 + 1 + 1 + log(N) ) + C*(1 + log(N)), removing constants and removing duplicates,
-    C * log(N)
+    Complexity: C * (1 + log(N) + log(N) + log(N) + 1 + 1 + 1), removing constants, C * log(N)
     """
 
+    @instrumented("choose_potions_for_vendors", lambda game, num_vendors: num_vendors)
     def choose_potions_for_vendors(self, num_vendors: int) -> list:
 
         inventory = []  # Treat this as vendor's inventory
-        temp = []  # To re-insert potions back into the AVL tree (prevent duplicate potions among vendors)
+        size = self.stock.__len__()  # O(1) number of potions with quantity > 0
+        picked = FenwickTree(size)  # O(1) marks the price ranks already given to a vendor (prevent duplicate potions)
         for m in range(num_vendors):  # O(C) iterating through entire length of num_vendors
-            # Generates a random number from 1 - Potions with quantity > 0 ( lets call it p)
-            p = self.rand.randint(self.stock.__len__())  # O(1) Assumed to be this as stated in requirements
-
-            # Selects the p-th highest price using kth largest
-            pot_rand = self.stock.kth_largest(p)  # O(log(N) as accordance to explanation in avl.py
-            temp.append(
-                pot_rand.item)  # Get the potion item that was added into vendor's inventory to re-append later. O(1)
-            # since appending to array
+            # Generates a random number from 1 - Potions with quantity > 0 that are not picked yet ( lets call it p)
+            p = self.rand.randint(size - m)  # O(1) Assumed to be this as stated in requirements
+
+            # Rank (k-th largest price) of the p-th highest price among the potions not picked yet
+            rank = picked.kth_free(p)  # O(log(N)) as accordance to explanation in fenwick_tree.py
+            picked.add(rank)  # O(log(N)) mark it as picked
+
+            # Selects the rank-th highest price using kth largest
+            pot_rand = self.stock.kth_largest(rank)  # O(log(N) as accordance to explanation in avl.py
             name = pot_rand.item.name  # O(1) assigning value
             quantity = pot_rand.item.quantity  # O(1) assigning value
             inventory.append((name, quantity))  # O(1) assigning value to array
-
-            self.stock.__delitem__(
-                pot_rand.item.buy_price)  # O(log(N) (DELETING) as accordance to explanation in avl.py (basically AVL
-            # is a self-balancing tree)
-
-        for j in range(num_vendors):  # O(C) iterating through entire length of num_vendors
-            price = temp[j].buy_price  # O(1) assigning value
-            self.stock[price] = temp[j]  # O(log(N) (INSERTING) as accordance to explanation in avl.py
         return inventory
 
     """
@@ -130,74 +237,319 @@ class Game:
     """
     """
     First I iterate through the potion_valuations list to obtain the given fixed data, calculate the profits for each potion,
-    and insert the profits for each potion into an AVL tree, where the Key = Profit, Item = Potion. Key has been added with random
-    numbers so that the AVL tree will accept "duplicate" values, where the profit is the same but the potions are different.
+    and insert the profits for each potion into an AVL tree, where the Key = (Profit, -Buy price), Item = Potion. Potions with
+    the same profit are ranked by the cheaper one first, since it makes more money per dollar spent, and the AVL tree is
+    allowed to hold duplicate keys in case the same potion is valued twice.
     
     Next, I iterate through the starting money list and begin the simulation of calculating the maximum profit per day,
     where I make it so that I'll always be selling the most profitable potion to adventurers until the quantity empties,
     or just selling the most profitable item until the starting money is depleted.
     """
 
-    def solve_game(self, potion_valuations: list[tuple[str, float]], starting_money: list[int]) -> list[float]:
+    @instrumented("solve_game", lambda game, valuations, starting_money, mode="auto": len(starting_money))
+    def solve_game(self, potion_valuations: list[tuple[str, float]], starting_money: list[int],
+                   mode: str = "auto") -> list[float]:
+        if mode not in SOLVER_MODES:
+            raise ValueError("Unknown solver mode: " + str(mode))
+        if mode == "auto":
+            mode = "heap" if len(starting_money) <= LAZY_MAX_BUDGETS else "kth"
+        if self.solve_cache is not None:
+            # O(N + M) to build the key, same inventory and same valuations give the same answer
+            key = (self.inventory_version, valuation_fingerprint(potion_valuations), tuple(starting_money), mode)
+            potion_profits = self.solve_cache.get(key)
+            if potion_profits is None:
+                potion_profits = self.solve_game_uncached(potion_valuations, starting_money, mode)
+                self.solve_cache.put(key, potion_profits)
+            return list(potion_profits)  # copy, so callers can't change the cached result
+        return self.solve_game_uncached(potion_valuations, starting_money, mode)
+
+    @instrumented("solve_game_uncached", lambda game, valuations, starting_money, mode="kth": len(starting_money))
+    def solve_game_uncached(self, potion_valuations: list[tuple[str, float]], starting_money: list[int],
+                            mode: str = "kth") -> list[float]:
+        if mode == "heap":
+            return self.solve_with_heap(potion_valuations, starting_money)
+        profit_map = self.build_profit_map(potion_valuations)
+
+        if mode == "prefix":
+            return self.solve_with_budget_curve(profit_map, starting_money)
+        return self.solve_with_kth_largest(profit_map, starting_money)
+
+    @instrumented("solve_with_kth_largest", lambda game, profit_map, starting_money: len(starting_money))
+    def solve_with_kth_largest(self, profit_map: AVLTree, starting_money: list[int]) -> list[float]:
         potion_profits = []
-        profit_map = AVLTree()
+        for j in range(len(starting_money)):  # O(M) iterating each simulation with different starting money
+            available_money = starting_money[j]  # Obtaining values from list O(1)
+            not_net_profit = 0  # How much you scammed them O(1), money profited for the day
+            # O(N) iterating through the profitable potions only (unprofitable valuations are not in profit_map),
+            # determining the highest profit potion to sell
+            for k in range(len(profit_map)):
+                # O(log(N) as per explanation in avl.py, K-largest method, obtaining the k-th most profitable potion
+                highest_value_pot = profit_map.kth_largest(k + 1)
+                # Amount of potions available
+                quantity = highest_value_pot.item.quantity  # O(1) retrieving attributes and assigning into
+                # varaiable
+                # Price that the vendor (us) buy from the supplier
+                buy_cost = highest_value_pot.item.buy_price  # O(1) retrieving attributes and assigning into
+                # varaiable
+                # Total cost to clear the entire stock
+                total_cost = quantity * buy_cost  # Basic mathematical operations O(1)
+
+                # Both if and else are O(1) since it just consists of basic operations
+                # If enough money to clear the entire stock, buy entire stock,
+                if available_money >= total_cost:
+                    not_net_profit += (highest_value_pot.key[0] + buy_cost) * quantity  # Non-net profit
+                    # of money obtained by selling k-th most profitable potion
+                    available_money -= total_cost  # reduce the available amount of money (paying)
+
+                # if not enough to money to clear entire stock, just buy whatever you can.
+                else:
+                    capable_amount = (available_money / total_cost) * quantity  # Getting the maximum
+                    # amount of potions you can
+                    not_net_profit += capable_amount * (highest_value_pot.key[0] + buy_cost)  # Non-net profit of
+                    # money obtained by selling
+                    # k-th most profitable potion
+                    break  # no money left, loop ends
+            # One result per starting money, also when it clears every profitable potion in stock
+            not_net_profit = round(not_net_profit, 1)  # round off the profit value to 1 decimal( to pass
+            # testers, otherwise
+            # this would not be here)
+            potion_profits.append(not_net_profit)  # append into output
+        return potion_profits
 
+    """
+    Iterates through the potion_valuations list once, so overall complexity:
+    O(N * log(N))
+    Complexity: N * (1 + 1 + 1 + 1 + 1 + 1 + log(N)), so removing constants, N*log(N)
+    """
+
+    @instrumented("build_profit_map", lambda game, valuations: len(valuations))
+    def build_profit_map(self, potion_valuations: list[tuple[str, float]]) -> AVLTree:
+        profit_map = AVLTree(allow_duplicates=True)
+
+        # O(N) every potion looked up with one probe, None when the potion is not in the catalog
+        pots = self.hash_table.get_many([valuation[0] for valuation in potion_valuations])
         for i in range(len(potion_valuations)):  # O(N) iterating through len of potion_valuations
-            name = potion_valuations[i][0]  # name of potion valuation O(1)
             sell_adv = potion_valuations[i][1]  # price sold to adventurers O(1)
-            if self.hash_table.__contains__(name):  # O(1) assume hash function to be constant
-                pot = self.hash_table[name]  # retrieving pot details from hash map O(1)
-                randum = self.rand.randint(5000) / 1234712386  # to make it so that tree accepts duplicate profit
-                # inputs O(1)
-                profit = (sell_adv - pot.buy_price) + randum  # profit amount from selling to adventurers after
+            pot = pots[i]  # pot details from hash map O(1)
+            if pot is not None:
+                profit = sell_adv - pot.buy_price  # profit amount from selling to adventurers after
                 # buying from vendor O(1)
 
                 if profit > 0:  # if profit was made, throw into AVL tree  # O(1)
-                    profit_map[profit] = pot  # O(log(N) inserting data into AVL tree, explanation in avl.py
+                    # ties on profit go to the cheaper potion O(log(N) inserting data into AVL tree, explanation in
+                    # avl.py
+                    profit_map[(profit, -pot.buy_price)] = pot
+        return profit_map
 
+    """
+    The ranking is walked once to build the cumulative cost/revenue arrays of the budget curve, after which every 
+    starting money is a binary search over those arrays. So overall complexity:
+    O(N + M * log(N))
+    Complexity: N (walking profit_map) + M * (log(N) + 1 + 1), removing constants, N + M * log(N)
+    """
+
+    @instrumented("solve_with_budget_curve", lambda game, profit_map, starting_money: len(starting_money))
+    def solve_with_budget_curve(self, profit_map: AVLTree, starting_money: list[int]) -> list[float]:
+        curve = BudgetCurve.from_profit_map(profit_map)  # O(N) ranked once, most profitable potion first
+        potion_profits = []
         for j in range(len(starting_money)):  # O(M) iterating each simulation with different starting money
-            available_money = starting_money[j]  # Obtaining values from list O(1)
-            money_remain = True  # To indicate when to stop O(1), if adventurer still has money, continue the process
-            # of selling, else stop.
-            not_net_profit = 0  # How much you scammed them O(1), money profited for the day
-            for k in range(
-                    len(potion_valuations)):  # O(N) iterating through len of potion_valuations, determining the
-                # highest profit potion to sell
-                if money_remain:  # O(1)
-                    # O(log(N) as per explanation in avl.py, K-largest method, obtaining the k-th most profitable potion
-                    highest_value_pot = profit_map.kth_largest(k + 1)
-                    # Amount of potions available
-                    quantity = highest_value_pot.item.quantity  # O(1) retrieving attributes and assigning into
-                    # varaiable
-                    # Price that the vendor (us) buy from the supplier
-                    buy_cost = highest_value_pot.item.buy_price  # O(1) retrieving attributes and assigning into
-                    # varaiable
-                    # Total cost to clear the entire stock
-                    total_cost = quantity * buy_cost  # Basic mathematical operations O(1)
-
-                    # Both if and else-if are O(1) since it just consists of basic operations
-                    # If enough money to clear the entire stock, buy entire stock,
-                    if available_money >= total_cost:
-                        not_net_profit += (highest_value_pot.key + buy_cost) * quantity  # Non-net profit
-                        # of money obtained by selling k-th most profitable potion
-                        available_money -= total_cost  # reduce the available amount of money (paying)
-
-                    # if not enough to money to clear entire stock, just buy whatever you can.
-                    elif available_money < total_cost:
-                        capable_amount = (available_money / total_cost) * quantity  # Getting the maximum
-                        # amount of potions you can
-                        not_net_profit += capable_amount * (highest_value_pot.key + buy_cost)  # Non-net profit of
-                        # money obtained by selling
-                        # k-th most profitable potion
-                        money_remain = False  # signifies that no money left
-                else:
-                    not_net_profit = round(not_net_profit, 1)  # round off the profit value to 1 decimal( to pass
-                    # testers, otherwise
-                    # this would not be here)
-                    potion_profits.append(not_net_profit)  # append into output
-                    break  # loop ends
+            not_net_profit = curve.revenue(starting_money[j])  # O(log(N)) binary search + fractional top-up
+            potion_profits.append(round(not_net_profit, 1))  # same rounding as the kth_largest solver
         return potion_profits
 
+    """
+    The profitable potions are put in a list and heapified in O(N), instead of being inserted one by one into an AVL
+    tree. Starting money is visited from the smallest to the largest, and potions are popped from the heap (most
+    profitable first) onto a BudgetCurve only until the cumulative cost passes the current starting money, so the
+    potions that no starting money reaches are never ranked. So overall complexity:
+    O(N + K * log(N) + M * log(M))
+    where K is the number of potions bought with the largest starting money
+    """
+
+    @instrumented("solve_with_heap", lambda game, valuations, starting_money: len(starting_money))
+    def solve_with_heap(self, potion_valuations: list[tuple[str, float]], starting_money: list[int]) -> list[float]:
+        heap = []
+        for i in range(len(potion_valuations)):  # O(N)
+            name, sell_adv = potion_valuations[i]
+            pot = self.hash_table.get(name)  # O(1) one probe, None when the potion is not in the catalog
+            if pot is not None:
+                profit = sell_adv - pot.buy_price
+                if profit > 0:
+                    # Smallest entry first: largest profit, ties go to the cheaper potion like in build_profit_map,
+                    # i keeps Potions from being compared
+                    heap.append((-profit, pot.buy_price, i, pot, sell_adv))
+        heapq.heapify(heap)  # O(N)
+
+        curve = BudgetCurve()
+        potion_profits = [0] * len(starting_money)
+        order = sorted(range(len(starting_money)), key=starting_money.__getitem__)  # O(M * log(M))
+        for j in order:
+            budget = starting_money[j]
+            while heap and curve.cumulative_cost[-1] < budget:  # O(K * log(N)) over every starting money
+                _, buy_price, _, pot, sell_adv = heapq.heappop(heap)
+                curve.append(pot.quantity, buy_price, sell_adv)
+            potion_profits[j] = round(curve.revenue(budget), 1)  # O(log(K)), same rounding as the other solvers
+        return potion_profits
+
+    """
+    Same as solve_with_budget_curve, but every starting money is looked up at once with NumPy's searchsorted over the
+    cumulative cost array. The revenues are rounded with Python's round like the other solvers (np.round rounds the
+    value times 10 half to even, so 1.65000000000000001 would give 1.6 instead of 1.7), and returned as a list.
+    So overall complexity:
+    O(N * log(N) + M * log(N)) with the search running inside NumPy
+    """
+
+    @instrumented("solve_game_vectorized", lambda game, valuations, starting_money: len(starting_money))
+    def solve_game_vectorized(self, potion_valuations: list[tuple[str, float]], starting_money):
+        curve = BudgetCurve.from_profit_map(self.build_profit_map(potion_valuations))  # O(N * log(N))
+        # revenue_many falls back to the pure Python budget curve when NumPy is not installed
+        return [round(float(not_net_profit), 1) for not_net_profit in curve.revenue_many(starting_money)]
+
+    """
+    Valuation book.
+    Instead of passing every valuation to solve_game, the adventurer prices can be kept on the Game and changed one
+    at a time. Each potion is hashed once when its valuation changes and its place in valuation_ranking is updated
+    with one AVL deletion and one AVL insertion, so a change is:
+    O(log(V)) where V is the number of valuations in the book
+    solve_valuations only has to walk the ranking again, O(V), when something changed since the last call.
+    """
+
+    @instrumented("update_valuation", lambda game, name, price: 1)
+    def update_valuation(self, name: str, price: float) -> None:
+        if name in self.valuations:  # O(1)
+            self.remove_valuation(name)  # O(log(V))
+        key = None
+        pot = self.hash_table.get(name) if self.hash_table is not None else None  # O(1) one probe
+        if pot is not None:
+            profit = price - pot.buy_price  # O(1)
+            if profit > 0:  # only profitable potions are ranked
+                # same ranking as build_profit_map, ties on profit go to the cheaper potion
+                key = (profit, -pot.buy_price)
+                self.valuation_ranking[key] = (pot, price)  # O(log(V))
+        self.valuations[name] = (price, key)  # O(1)
+        self.valuation_curve = None
+
+    @instrumented("remove_valuation", lambda game, name: 1)
+    def remove_valuation(self, name: str) -> None:
+        """
+        :raises KeyError: when the potion has no valuation in the book
+        """
+        price, key = self.valuations.pop(name)  # O(1)
+        if key is not None:
+            del self.valuation_ranking[key]  # O(log(V))
+        self.valuation_curve = None
+
+    @instrumented("rebuild_valuation_ranking", lambda game: len(game.valuations))
+    def rebuild_valuation_ranking(self) -> None:
+        valuations = self.valuations
+        self.valuations = {}
+        self.valuation_ranking = AVLTree()
+        for name in valuations:  # O(V * log(V))
+            self.update_valuation(name, valuations[name][0])
+        self.valuation_curve = None
+
+    @instrumented("solve_valuations", lambda game, starting_money: len(starting_money))
+    def solve_valuations(self, starting_money: list[int]) -> list[float]:
+        self.build_valuation_curve()
+        potion_profits = []
+        for j in range(len(starting_money)):  # O(M * log(V))
+            potion_profits.append(round(self.valuation_curve.revenue(starting_money[j]), 1))
+        return potion_profits
+
+    def build_valuation_curve(self) -> BudgetCurve:
+        if self.valuation_curve is None:  # O(V), only after the book or the inventory changed
+            self.valuation_curve = BudgetCurve()
+            for node in self.valuation_ranking.iter_nodes_descending():
+                pot, price = node.item
+                self.valuation_curve.append(pot.quantity, pot.buy_price, price)
+        return self.valuation_curve
+
+    """
+    The budget to revenue function solve_game computes, as a standalone piecewise linear BudgetCurve that can be
+    evaluated (revenue), inverted (budget_for) and serialised (to_dict) without the Game.
+    Built from potion_valuations in O(N * log(N)), or copied from the valuation book in O(V) when none are given.
+    """
+
+    @instrumented("budget_curve", lambda game, valuations: len(valuations) if valuations is not None else 0)
+    def budget_curve(self, potion_valuations: list[tuple[str, float]] = None) -> BudgetCurve:
+        if potion_valuations is None:
+            return BudgetCurve.from_dict(self.build_valuation_curve().to_dict())  # copy, the book keeps its own
+        return BudgetCurve.from_profit_map(self.build_profit_map(potion_valuations))
+
+    """
+    Sensitivity analysis, see sensitivity.py. Each perturbation maps potion types to a factor applied to what the
+    adventurers pay for them, and gets one row of revenues, one per starting money, equal to solve_game over the
+    perturbed valuations. The valuations are hashed once and every potion type is only ranked again for the factors
+    that change it, so P perturbations cost:
+    O(N + P * (N * log(T) + M * log(N))) plus O(C * log(C)) per distinct (potion type, factor)
+    where T is the number of potion types and C the number of valuations of one type
+    """
+
+    @instrumented("solve_sensitivity",
+                  lambda game, valuations, perturbations, starting_money: len(perturbations) * len(starting_money))
+    def solve_sensitivity(self, potion_valuations: list[tuple[str, float]], perturbations: list[dict],
+                          starting_money: list[int]) -> list[list[float]]:
+        return SensitivityAnalysis(self.hash_table, potion_valuations).solve(perturbations, starting_money)
+
+    """
+    Opt-in memoisation of solve_game, keyed on inventory_version, the valuations, the starting money and the mode.
+    """
+
+    def enable_solve_cache(self, maxsize: int = 128) -> SolveCache:
+        self.solve_cache = SolveCache(maxsize)
+        return self.solve_cache
+
+    def disable_solve_cache(self) -> None:
+        self.solve_cache = None
+
+    """
+    Opt-in instrumentation, see game_metrics.py. Every public method that reads or changes the game and the solver
+    phases (build_profit_map, solve_with_kth_largest, solve_with_budget_curve, rebuild_valuation_ranking) record
+    their calls, time and items while metrics are enabled; while they are not, each call only pays for one attribute
+    check. The cache and metrics switches, load and the stock_node helper are not recorded.
+    """
+
+    def enable_metrics(self) -> GameMetrics:
+        self.metrics = GameMetrics()
+        return self.metrics
+
+    def disable_metrics(self) -> None:
+        self.metrics = None
+
+    def metrics_snapshot(self) -> dict:
+        """
+        :raises ValueError: when metrics are not enabled
+        """
+        if self.metrics is None:
+            raise ValueError("Metrics are not enabled")
+        return self.metrics.snapshot(self.hash_table)
+
+    def write_metrics(self, path: str) -> None:
+        """
+        Write the metrics to path in the Prometheus text format.
+        :raises ValueError: when metrics are not enabled
+        """
+        if self.metrics is None:
+            raise ValueError("Metrics are not enabled")
+        self.metrics.write_prometheus(path, self.hash_table)
+
+    """
+    Checkpoints, see checkpoint.py for the file layout.
+    Saving and loading are both O(T + C + V) where T is the hash table size, C the stock size and V the size of the
+    valuation book: loading puts potions straight back into their hash table slots and builds the AVL trees from
+    sorted order, so nothing is rehashed or rotated.
+    """
+
+    @instrumented("save", lambda game, path: len(game.hash_table) if game.hash_table is not None else 0)
+    def save(self, path: str) -> None:
+        checkpoint.save_game(self, path)
+
+    @classmethod
+    def load(cls, path: str, potion_class: type = Potion) -> Game:
+        game = cls(potion_class=potion_class)
+        checkpoint.restore_game(game, path)
+        return game
+
 
 if __name__ == '__main__':
     g = Game()
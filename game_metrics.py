@@ -0,0 +1,127 @@
+""" Game Metrics
+
+Opt-in call counts, cumulative time and item counts for the Game methods and their inner phases.
+Methods are wrapped with instrumented, which only costs an attribute check while the game has no GameMetrics.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import functools
+import inspect
+import os
+import time
+
+
+def instrumented(name: str, items=None):
+    """
+    Decorator recording every call of a Game method under name in game.metrics, when it is set.
+    items is called after the call with the game and every argument of the method passed by position (defaults
+    filled in, however the caller passed them), and returns the number of items (rows, pairs, vendors, budgets...)
+    the call handled. A call that succeeded is never made to fail by its metrics: when items raises, 0 is recorded.
+    """
+    def decorate(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(game, *args, **kwargs):
+            metrics = game.metrics
+            if metrics is None:
+                return method(game, *args, **kwargs)
+            start = time.perf_counter()
+            result = method(game, *args, **kwargs)
+            seconds = time.perf_counter() - start
+            metrics.record(name, seconds, count_items(items, signature, game, args, kwargs))
+            return result
+        return wrapper
+    return decorate
+
+
+def count_items(items, signature: inspect.Signature, game, args: tuple, kwargs: dict) -> int:
+    """
+    Number of items of a call that returned, see instrumented. 0 when there is no items function or it fails.
+    """
+    if items is None:
+        return 0
+    try:
+        bound = signature.bind(game, *args, **kwargs)
+        bound.apply_defaults()
+        return items(*bound.args, **bound.kwargs)
+    except Exception:
+        return 0
+
+
+class GameMetrics:
+    """
+    Game Metrics
+
+    attributes:
+        calls: K = method or phase name, I = number of calls
+        seconds: K = method or phase name, I = cumulative time spent in it
+        items: K = method or phase name, I = cumulative number of items handled
+    """
+
+    def __init__(self) -> None:
+        self.calls = {}
+        self.seconds = {}
+        self.items = {}
+
+    def record(self, name: str, seconds: float, items: int = 0) -> None:
+        """
+        Add one call of name
+        :complexity: O(1)
+        """
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.seconds[name] = self.seconds.get(name, 0) + seconds
+        self.items[name] = self.items.get(name, 0) + items
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.seconds.clear()
+        self.items.clear()
+
+    def snapshot(self, hash_table=None) -> dict:
+        """
+        Returns {"methods": {name: {"calls", "seconds", "items"}}, "hash_table": {...}}, a copy that later calls
+        don't change. The hash table part holds the statistics of hash_table, it is empty when hash_table is None.
+        :complexity: O(P) where P is the number of methods and phases recorded
+        """
+        table_statistics = {}
+        if hash_table is not None:
+            conflict_count, probe_total, probe_max = hash_table.statistics()
+            table_statistics = {"count": len(hash_table), "table_size": len(hash_table.table),
+                                "conflict_count": conflict_count, "probe_total": probe_total,
+                                "probe_max": probe_max}
+        return {
+            "methods": {name: {"calls": self.calls[name], "seconds": self.seconds[name], "items": self.items[name]}
+                        for name in self.calls},
+            "hash_table": table_statistics,
+        }
+
+    def to_prometheus(self, hash_table=None, prefix: str = "potion_game") -> str:
+        """
+        Returns the snapshot in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot(hash_table)
+        lines = []
+        for metric, kind, help_text in [("calls", "counter", "Number of calls"),
+                                        ("seconds", "counter", "Cumulative time spent, in seconds"),
+                                        ("items", "counter", "Cumulative number of items handled")]:
+            lines.append("# HELP " + prefix + "_" + metric + "_total " + help_text)
+            lines.append("# TYPE " + prefix + "_" + metric + "_total " + kind)
+            for name in sorted(snapshot["methods"]):
+                lines.append(prefix + "_" + metric + '_total{method="' + name + '"} ' +
+                             repr(snapshot["methods"][name][metric]))
+        for statistic in snapshot["hash_table"]:
+            lines.append("# TYPE " + prefix + "_hash_table_" + statistic + " gauge")
+            lines.append(prefix + "_hash_table_" + statistic + " " + str(snapshot["hash_table"][statistic]))
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, hash_table=None, prefix: str = "potion_game") -> None:
+        """
+        Write to_prometheus to path, replacing it as a whole so a scraper never reads half a file.
+        """
+        temporary = path + ".tmp"
+        with open(temporary, "w") as f:
+            f.write(self.to_prometheus(hash_table, prefix))
+        os.replace(temporary, path)
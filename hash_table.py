@@ -1,15 +1,18 @@
 """ Hash Table ADT
 
 Defines a Hash Table using Linear Probing for conflict resolution.
-It currently rehashes the primary cluster to handle deletion.
+It handles deletion by shifting the rest of the primary cluster back, so no tombstones are left behind.
+The table grows to a prime size whenever an insertion would take it past its maximum load factor.
 """
 __author__ = 'Brendon Taylor, modified by Jackson Goerner'
 __docformat__ = 'reStructuredText'
 __modified__ = '21/05/2020'
 __since__ = '14/05/2020'
 
+import math
 from random import Random, seed
 
+import primes
 from potion import Potion
 from random_gen import RandomGen
 from referential_array import ArrayR
@@ -17,20 +20,36 @@ from typing import TypeVar, Generic
 
 T = TypeVar('T')
 
+# Linear probing keeps short probe chains up to about half full
+DEFAULT_MAX_LOAD_FACTOR = 0.5
+
 
 class LinearProbePotionTable(Generic[T]):
     """
     Linear Probe Potion Table
 
-    This potion table does not support deletion.
+    Unless tablesize_override is given, the table starts at the smallest prime size that holds max_potions
+    within max_load_factor. Whenever an insertion would push count / table size past max_load_factor, the table
+    grows to a prime at least twice its size and every entry is rehashed into it. A max_load_factor of None keeps
+    the table at a fixed size, which then refuses insertions once full.
+    max_load_factor defaults to DEFAULT_MAX_LOAD_FACTOR, or to None when tablesize_override is given: a table the
+    caller sized keeps its size unless a max_load_factor is passed too.
 
     attributes:
         count: number of elements in the hash table
         table: used to represent our internal array
         table_size: current size of the hash table
+        max_load_factor: largest count / table size allowed before growing, or None
+        hash_codes: K = key in the table, I = its table size independent hash code (Potion.good_hash_code or
+                    bad_hash_code), which decides its slot (see hash)
     """
 
-    def __init__(self, max_potions: int, good_hash: bool = True, tablesize_override: int = -1) -> None:
+    def __init__(self, max_potions: int, good_hash: bool = True, tablesize_override: int = -1,
+                 max_load_factor: float = -1) -> None:
+        if max_load_factor == -1:
+            max_load_factor = None if tablesize_override > -1 else DEFAULT_MAX_LOAD_FACTOR
+        if max_load_factor is not None and not 0 < max_load_factor <= 1:
+            raise ValueError("max_load_factor must be in (0, 1]")
         # Statistic setting
         self.conflict_count = 0
         self.probe_max = 0
@@ -38,19 +57,37 @@ class LinearProbePotionTable(Generic[T]):
         # Instantiating variables
         self.max_potions = max_potions
         self.good_hash = good_hash
+        self.max_load_factor = max_load_factor
+        self.hash_codes = {}
         if tablesize_override > -1:
             self.count = 0
             self.table = ArrayR(tablesize_override)
-        else:
+        elif max_load_factor is None:
             self.initalise_with_tablesize(max_potions)
+        else:
+            self.initalise_with_tablesize(primes.next_prime(math.ceil(max_potions / max_load_factor)))
 
     def hash(self, potion_name: str) -> int:
-        if self.good_hash is True:
-            key = Potion.good_hash(potion_name, len(self.table))
-            return key
-        else:
-            key = Potion.bad_hash(potion_name, len(self.table))
-            return key
+        """
+        Position of potion_name for the current table size: good_hash_code(potion_name) % len(table), or
+        bad_hash_code with a bad hash table (the same position as Potion.bad_hash). Potion.good_hash no longer
+        decides positions, good_hash_code reduces the same polynomial by a fixed prime rather than the table size.
+        :complexity: O(1) for a key in the table, O(K) otherwise where K is the size of the key
+        """
+        return self.hash_code(potion_name) % len(self.table)
+
+    def hash_code(self, potion_name: str) -> int:
+        """
+        Table size independent hash code of potion_name, cached for the keys in the table
+        :complexity: O(1) for a key in the table, O(K) otherwise where K is the size of the key
+        """
+        code = self.hash_codes.get(potion_name)
+        if code is None:
+            if self.good_hash is True:
+                code = Potion.good_hash_code(potion_name)
+            else:
+                code = Potion.bad_hash_code(potion_name)
+        return code
 
     def statistics(self) -> tuple:
         return self.conflict_count, self.probe_total, self.probe_max
@@ -71,20 +108,23 @@ class LinearProbePotionTable(Generic[T]):
                            where N is the table_size
         :raises KeyError: When a position can't be found
         """
+        if not is_insert:
+            position = self.__find(key)
+            if position < 0:
+                raise KeyError(key)  # so the key is not in
+            return position
+
         position = self.hash(key)  # get the position using hash
 
-        if is_insert and self.is_full():
+        if self.is_full():
             raise KeyError(key)
 
         counter = 0
         for _ in range(len(self.table)):  # start traversing
             if self.table[position] is None:  # found empty slot
-                if is_insert:
-                    if counter > 0:
-                        self.conflict_count += 1
-                    return position
-                else:
-                    raise KeyError(key)  # so the key is not in
+                if counter > 0:
+                    self.conflict_count += 1
+                return position
             elif self.table[position][0] == key:  # found key
                 return position
             else:  # there is something but not the key, try next
@@ -96,17 +136,67 @@ class LinearProbePotionTable(Generic[T]):
 
         raise KeyError(key)
 
+    def __find(self, key: str) -> int:
+        """
+        Position of key in the hash table, or -1 when it is not in it. Probes past other keys count in statistics().
+        :complexity best: O(K) first position is empty or holds the key
+                          where K is the size of the key
+        :complexity worst: O(K + N) when we've searched the entire table
+                           where N is the table_size
+        """
+        position = self.hash(key)
+        counter = 0
+        for _ in range(len(self.table)):
+            item = self.table[position]
+            if item is None:  # found empty slot, so the key is not in
+                return -1
+            elif item[0] == key:  # found key
+                return position
+            else:  # there is something but not the key, try next
+                self.probe_total += 1
+                counter += 1
+                if counter >= self.probe_max:
+                    self.probe_max = counter
+                position = (position + 1) % len(self.table)
+        return -1
+
     def __contains__(self, key: str) -> bool:
         """
         Checks to see if the given key is in the Hash Table
-        :see: #self.__getitem__(self, key: str)
+        :see: #self.__find(self, key: str)
         """
-        try:
-            _ = self[key]
-        except KeyError:
-            return False
-        else:
-            return True
+        return self.__find(key) >= 0
+
+    def get(self, key: str, default: T = None) -> T:
+        """
+        Get the item at a certain key, or default when the key doesn't exist.
+        One probe and no exception, instead of __contains__ followed by __getitem__
+        :see: #self.__find(self, key: str)
+        """
+        position = self.__find(key)
+        if position < 0:
+            return default
+        return self.table[position][1]
+
+    def get_many(self, keys: list[str], default: T = None) -> list[T]:
+        """
+        get for every key, in the same order
+        :complexity: O(L * K) where L is the number of keys, when the probe chains are short
+        """
+        get = self.get
+        return [get(key, default) for key in keys]
+
+    def setdefault(self, key: str, default: T = None) -> T:
+        """
+        Get the item at a certain key, inserting default first when the key doesn't exist.
+        A key that exists costs one probe, a new one costs a second probe to insert it.
+        :see: #self.__find(self, key: str)
+        """
+        position = self.__find(key)
+        if position >= 0:
+            return self.table[position][1]
+        self[key] = default
+        return default
 
     def __getitem__(self, key: str) -> T:
         """
@@ -123,14 +213,45 @@ class LinearProbePotionTable(Generic[T]):
         :see: #self.__linear_probe(key: str, is_insert: bool)
         :see: #self.__contains__(key: str)
         """
+        if self.max_load_factor is not None and self.count + 1 > self.max_load_factor * len(self.table) \
+                and key not in self:
+            self.rehash(max(2 * len(self.table), math.ceil((self.count + 1) / self.max_load_factor)))
         if len(self) == len(self.table) and key not in self:
             raise ValueError("Cannot insert into a full table.")
+        if key not in self.hash_codes:  # hashed once, for as long as the key stays in the table
+            self.hash_codes[key] = self.hash_code(key)
         position = self.__linear_probe(key, True)
 
         if self.table[position] is None:
             self.count += 1
         self.table[position] = (key, data)
 
+    def __delitem__(self, key: str) -> None:
+        """
+        Remove key and its data from the hash table.
+        Every entry after it in the same cluster that could have been placed in the freed slot is moved back into
+        it (backward-shift deletion), so lookups never walk over deleted slots and stay as short as if the key had
+        never been inserted.
+        :complexity best: O(K) the next slot is empty
+        :complexity worst: O(K + C * K) where C is the length of the cluster after key
+        :raises KeyError: when the key doesn't exist
+        """
+        hole = self.__linear_probe(key, False)
+        self.table[hole] = None
+        self.count -= 1
+        self.hash_codes.pop(key, None)
+
+        position = (hole + 1) % len(self.table)
+        while self.table[position] is not None:
+            home = self.hash(self.table[position][0])
+            # The entry can move back when its home slot is not between the hole and where it is now (cyclically)
+            if (hole < position and not hole < home <= position) or \
+                    (position < hole and position < home <= hole):
+                self.table[hole] = self.table[position]
+                self.table[position] = None
+                hole = position
+            position = (position + 1) % len(self.table)
+
     def initalise_with_tablesize(self, tablesize: int) -> None:
         """
         Initialise a new array, with table size given by tablesize.
@@ -139,6 +260,23 @@ class LinearProbePotionTable(Generic[T]):
         self.count = 0
         self.table = ArrayR(tablesize)
 
+    def rehash(self, tablesize: int) -> None:
+        """
+        Move every entry into a new table of the smallest prime size that is at least tablesize.
+        Keys are not hashed again, their cached hash codes are reduced to the new size.
+        The statistics are counted again from the new layout.
+        :complexity: O(T + N) where T is the new table size and N the number of entries, when the probe chains are
+                     short
+        """
+        entries = [item for item in self.table if item is not None]
+        self.conflict_count = 0
+        self.probe_total = 0
+        self.probe_max = 0
+        self.initalise_with_tablesize(primes.next_prime(tablesize))
+        for key, data in entries:
+            self.table[self.__linear_probe(key, True)] = (key, data)
+            self.count += 1
+
     def is_empty(self):
         """
         Returns whether the hash table is empty
@@ -214,6 +352,7 @@ class LinearProbePotionTable(Generic[T]):
 
 
 if __name__ == '__main__':
+    # Good hash tables place names by Potion.good_hash_code, bad hash ones by Potion.bad_hash_code (see hash)
     # tablesize = 120
     good_hash_1 = LinearProbePotionTable(100, True, 120)
     names_1 = good_hash_1.fake_data_generation(70)
@@ -1,5 +1,11 @@
+import sys
+from typing import NamedTuple
+
 import primes
 
+# Mersenne prime the table size independent hash codes are reduced by, so they stay below 2^61
+HASH_CODE_MODULUS = 2 ** 61 - 1
+
 
 class Potion:
 
@@ -51,6 +57,34 @@ class Potion:
 
         return result
 
+    """
+    Table size independent versions of good_hash and bad_hash, so a hash table can keep one code per name and find
+    its slot in any table size with one modulo.
+    good_hash_code is the same polynomial as good_hash, reduced modulo HASH_CODE_MODULUS instead of the table size:
+    the code stays a machine-sized integer however long the name is, but good_hash_code(name) % tablesize is not
+    good_hash(name, tablesize). LinearProbePotionTable places names by good_hash_code, so good_hash no longer
+    decides any slot position.
+    bad_hash_code(name) % tablesize == bad_hash(name, tablesize) for every table size.
+    """
+
+    @classmethod
+    def good_hash_code(cls, potion_name: str, hash_base: int = primes.largest_prime(10000)) -> int:
+        """
+        :complexity: O(K) where K is the size of the key
+        """
+        if len(potion_name) > 10 and potion_name[0:10] == "Potion of ":
+            potion_name = potion_name[10:]  # keyword only, like good_hash
+        result = 0
+        for char in potion_name:
+            result = (result * hash_base + ord(char)) % HASH_CODE_MODULUS
+        return result
+
+    @classmethod
+    def bad_hash_code(cls, potion_name: str, hash_base: int = primes.largest_prime(10000)) -> int:
+        if len(potion_name) > 10 and potion_name[0:10] == "Potion of ":
+            return ord(potion_name[11]) * hash_base
+        return ord(potion_name[0]) * hash_base
+
     def __str__(self) -> str:
         """
         Returns all they key/value pairs in our hash table (no particular order)
@@ -58,3 +92,103 @@ class Potion:
         """
         return "Name: " + str(self.name) + ", Type: " + str(self.potion_type) + ", Quantity: " + str(
             self.quantity) + ",Price: " + str(self.buy_price)
+
+
+class CompactPotion:
+    """
+    Memory compact stand-in for Potion: __slots__ instead of a per-instance __dict__, and potion types interned so
+    that every "Health" potion points at the same string.
+    """
+
+    __slots__ = ("potion_type", "name", "buy_price", "quantity")
+
+    def __init__(self, potion_type: str, name: str, buy_price: float, quantity: float) -> None:
+        self.potion_type = sys.intern(potion_type) if isinstance(potion_type, str) else potion_type
+        self.name = name
+        self.buy_price = buy_price
+        self.quantity = quantity
+
+    @classmethod
+    def create_empty(cls, potion_type: str, name: str, buy_price: float) -> 'CompactPotion':
+        return cls(potion_type, name, buy_price, 0)
+
+    def __str__(self) -> str:
+        return "Name: " + str(self.name) + ", Type: " + str(self.potion_type) + ", Quantity: " + str(
+            self.quantity) + ",Price: " + str(self.buy_price)
+
+
+class PotionSpec(NamedTuple):
+    """
+    Immutable catalog part of a potion (everything but its quantity).
+    """
+    potion_type: str
+    name: str
+    buy_price: float
+
+
+class SplitPotion:
+    """
+    Potion split into an immutable, shareable PotionSpec and its mutable quantity. Several stocks (or games) can
+    point at the same PotionSpec objects and only pay for their own quantities.
+    """
+
+    __slots__ = ("spec", "quantity")
+
+    def __init__(self, potion_type: str, name: str, buy_price: float, quantity: float) -> None:
+        if isinstance(potion_type, str):
+            potion_type = sys.intern(potion_type)
+        self.spec = PotionSpec(potion_type, name, buy_price)
+        self.quantity = quantity
+
+    @classmethod
+    def create_empty(cls, potion_type: str, name: str, buy_price: float) -> 'SplitPotion':
+        return cls(potion_type, name, buy_price, 0)
+
+    @classmethod
+    def from_spec(cls, spec: PotionSpec, quantity: float = 0) -> 'SplitPotion':
+        """ Share an existing catalog part instead of building a new one. """
+        potion = cls.__new__(cls)
+        potion.spec = spec
+        potion.quantity = quantity
+        return potion
+
+    @property
+    def potion_type(self) -> str:
+        return self.spec.potion_type
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+    @property
+    def buy_price(self) -> float:
+        return self.spec.buy_price
+
+    def __str__(self) -> str:
+        return "Name: " + str(self.name) + ", Type: " + str(self.potion_type) + ", Quantity: " + str(
+            self.quantity) + ",Price: " + str(self.buy_price)
+
+
+if __name__ == '__main__':
+    import tracemalloc
+
+    categories = ["Health", "Buff", "Damage", "Utility"]
+    for num_potions in [1000, 100000]:
+        # Names are shared by both runs, potion types are fresh strings per row as if parsed from a file
+        names = ["Potion of " + str(x) for x in range(num_potions)]
+        for potion_class in [Potion, CompactPotion, SplitPotion]:
+            tracemalloc.start()
+            catalog = [potion_class.create_empty("".join(categories[x % 4]), names[x], x + 0.5)
+                       for x in range(num_potions)]
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            print(potion_class.__name__ + ",", num_potions, "potions:", size // num_potions, "bytes per potion")
+            del catalog
+        # A second stock over the same catalog only pays for the SplitPotion and its quantity
+        specs = [SplitPotion.create_empty(categories[x % 4], names[x], x + 0.5).spec for x in range(num_potions)]
+        tracemalloc.start()
+        catalog = [SplitPotion.from_spec(spec, 1.5) for spec in specs]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print("SplitPotion sharing specs,", num_potions, "potions:", size // num_potions, "bytes per potion")
+        del catalog
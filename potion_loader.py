@@ -0,0 +1,163 @@
+""" Potion Loader
+
+Streams potion catalogs and restock files into a Game without reading them
+into lists first. Two file formats are understood:
+
+    csv     catalog rows: potion type, name, buy price
+            restock rows: name, quantity
+            (a header row is skipped with has_header=True)
+    jsonl   one row per line, either as a list in the same column order or
+            as an object with the keys potion_type, name, buy_price / name, quantity
+
+Catalog rows go straight into a LinearProbePotionTable sized from a row count
+(counted with a cheap pass over the raw bytes when the file is seekable and no
+hint is given). Any other iterator of lines, such as a generator or a pipe,
+starts from DEFAULT_SIZE_HINT and the table grows past its load factor as rows
+arrive. Restock rows are applied in bounded chunks.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import csv
+import io
+import json
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+
+from game import Game
+
+# Bytes read at a time when counting rows
+COUNT_BLOCK_SIZE = 1 << 20
+# Table size hint for catalogs whose rows can't be counted up front
+DEFAULT_SIZE_HINT = 64
+
+
+def parse_number(text) -> float:
+    """ Keep integers as integers, like the values given to Game by hand. """
+    if isinstance(text, (int, float)):
+        return text
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def iter_csv_rows(lines: Iterable[str], has_header: bool = False) -> Iterator[list]:
+    """
+    Lazily split CSV lines into rows, skipping blank lines.
+    :complexity: O(L) per row where L is the length of its line
+    """
+    reader = csv.reader(lines)
+    if has_header:
+        next(reader, None)
+    for row in reader:
+        if row:
+            yield row
+
+
+def iter_jsonl_rows(lines: Iterable[str], keys: tuple) -> Iterator[list]:
+    """
+    Lazily parse JSON lines into rows, ordering object rows by keys.
+    :complexity: O(L) per row where L is the length of its line
+    """
+    for line in lines:
+        if line.strip():
+            row = json.loads(line)
+            if isinstance(row, dict):
+                row = [row[key] for key in keys]
+            yield row
+
+
+def iter_catalog(lines: Iterable[str], file_format: str = "csv", has_header: bool = False) -> Iterator[tuple]:
+    """
+    Lazily read (potion type, name, buy price) catalog rows.
+    """
+    if file_format == "csv":
+        rows = iter_csv_rows(lines, has_header)
+    elif file_format == "jsonl":
+        rows = iter_jsonl_rows(lines, ("potion_type", "name", "buy_price"))
+    else:
+        raise ValueError("Unknown file format: " + str(file_format))
+    for pot_type, name, price in rows:
+        yield pot_type, name, parse_number(price)
+
+
+def iter_restock(lines: Iterable[str], file_format: str = "csv", has_header: bool = False) -> Iterator[tuple]:
+    """
+    Lazily read (name, quantity) restock rows.
+    """
+    if file_format == "csv":
+        rows = iter_csv_rows(lines, has_header)
+    elif file_format == "jsonl":
+        rows = iter_jsonl_rows(lines, ("name", "quantity"))
+    else:
+        raise ValueError("Unknown file format: " + str(file_format))
+    for name, quantity in rows:
+        yield name, parse_number(quantity)
+
+
+def count_rows(file: TextIO, has_header: bool = False) -> int:
+    """
+    Upper bound on the number of rows of a seekable file (blank lines are counted too), found by counting the line
+    breaks of its raw bytes block by block. The file is rewound afterwards.
+    :complexity: O(B) where B is the size of the file, with O(1) memory
+    """
+    start = file.tell()
+    count = 0
+    if hasattr(file, "buffer"):
+        raw = file.buffer
+        raw.seek(start)
+        last = b"\n"
+        while True:
+            block = raw.read(COUNT_BLOCK_SIZE)
+            if not block:
+                break
+            count += block.count(b"\n")
+            last = block[-1:]
+        if last != b"\n":  # last line has no line break
+            count += 1
+    else:
+        for _ in file:
+            count += 1
+    file.seek(start)
+    return count - 1 if has_header and count > 0 else count
+
+
+def load_catalog(game: Game, file: Iterable[str], file_format: str = "csv", has_header: bool = False,
+                 size_hint: int = -1) -> None:
+    """
+    Stream a catalog file, or any iterator of lines, into game.set_total_potion_data. The hash table is sized from
+    size_hint, or from a counting pass over a seekable file when no hint is given, or from DEFAULT_SIZE_HINT.
+    :complexity: O(N) where N is the number of rows, with no intermediate list of rows
+    """
+    if size_hint < 0:
+        if getattr(file, "seekable", lambda: False)():
+            size_hint = count_rows(file, has_header)
+        else:  # generator, pipe...: the table grows as rows arrive
+            size_hint = DEFAULT_SIZE_HINT
+    game.set_total_potion_data(iter_catalog(file, file_format, has_header), size_hint=size_hint)
+
+
+def load_restock(game: Game, file: TextIO, file_format: str = "csv", has_header: bool = False,
+                 chunk_size: int = 10000) -> None:
+    """
+    Stream a restock file into game.restock, chunk_size rows at a time.
+    :complexity: O(D * log(C)) where D is the number of rows and C the number of potions in stock
+    """
+    rows = iter_restock(file, file_format, has_header)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        game.restock(chunk)
+
+
+if __name__ == '__main__':
+    catalog_file = io.StringIO("potion_type,name,buy_price\n" + "".join(
+        ["Health", "Buff", "Damage"][x % 3] + ",Potion of " + str(x) + "," + str(x + 1) + "\n" for x in range(1000)))
+    restock_file = io.StringIO("".join('{"name": "Potion of ' + str(x) + '", "quantity": 2}\n' for x in range(500)))
+    G = Game()
+    load_catalog(G, catalog_file, has_header=True, size_hint=1000)
+    load_restock(G, restock_file, file_format="jsonl", chunk_size=128)
+    print(len(G.hash_table), len(G.stock))
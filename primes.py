@@ -29,5 +29,25 @@ def largest_prime(k: int) -> int:
             return b[i]
 
 
+def is_prime(k: int) -> bool:
+    # trial division by the odd numbers up to the square root of k
+    if k < 2:
+        return False
+    if k % 2 == 0:
+        return k == 2
+    for i in range(3, math.isqrt(k) + 1, 2):
+        if k % i == 0:
+            return False
+    return True
+
+
+def next_prime(k: int) -> int:
+    # smallest prime that is at least k, primes are about log(k) apart so few candidates are tried
+    k = max(k, 2)
+    while not is_prime(k):
+        k += 1
+    return k
+
+
 if __name__ == '__main__':
     print(largest_prime(1000))
@@ -12,13 +12,23 @@ class RandomGen:
 
     def __init__(self, seed: int = 0) -> None:
         self.seed = seed
+        self.state = seed  # last number drawn from the LCG, enough to resume it
         self.x = lcg(pow(2, 32), 134775813, 1, self.seed)
 
+    def getstate(self) -> int:
+        return self.state
+
+    def setstate(self, state: int) -> None:
+        """ Resume the LCG right after state, as returned by getstate. """
+        self.state = state
+        self.x = lcg(pow(2, 32), 134775813, 1, state)
+
     def randint(self, k: int) -> int:
         random_array = []
         temp_bin = ""
         for i in range(5):  # Generate the first 5 random numbers
-            random_array.append(next(self.x))
+            self.state = next(self.x)
+            random_array.append(self.state)
 
         output_16 = []
         for j in range(len(random_array)):  # converting the random number into 32 bits
@@ -0,0 +1,255 @@
+""" Robin Hood Hash Table ADT
+
+Defines a Hash Table using Robin Hood hashing, a variant of Linear Probing: while probing for a free slot, an entry
+that is further from its home slot than the entry it meets takes that slot, and the displaced entry carries on
+probing. Displacements stay close to each other, so the longest probe is much shorter under skewed names, and a
+lookup can stop as soon as it meets an entry closer to its home than the key would be.
+Deletion shifts the rest of the cluster back, like LinearProbePotionTable.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import math
+
+import primes
+from hash_table import LinearProbePotionTable, T
+from referential_array import ArrayR
+
+
+class RobinHoodPotionTable(LinearProbePotionTable[T]):
+    """
+    Robin Hood Potion Table
+
+    Same interface, sizing policy and statistics tuple as LinearProbePotionTable:
+        conflict_count: insertions that found their home slot taken
+        probe_total: slots stepped past by insertions and lookups
+        probe_max: longest distance from its home slot reached by an insertion or a lookup
+
+    attributes:
+        distance: distance[i] is how far the entry in table[i] is from its home slot
+    """
+
+    def __init__(self, max_potions: int, good_hash: bool = True, tablesize_override: int = -1,
+                 max_load_factor: float = -1) -> None:
+        super().__init__(max_potions, good_hash, tablesize_override, max_load_factor)
+        self.distance = ArrayR(len(self.table))
+
+    def initalise_with_tablesize(self, tablesize: int) -> None:
+        """
+        Initialise a new array, with table size given by tablesize.
+        Complexity: O(n), where n is len(tablesize)
+        """
+        super().initalise_with_tablesize(tablesize)
+        self.distance = ArrayR(tablesize)
+
+    def __find(self, key: str) -> int:
+        """
+        Position of key in the hash table, or -1 when it is not in it
+        :complexity best: O(K) first position is empty, holds the key or an entry closer to its home
+                          where K is the size of the key
+        :complexity worst: O(K + D) where D is the largest distance of an entry from its home slot
+        """
+        position = self.hash(key)
+        for distance in range(len(self.table)):
+            item = self.table[position]
+            # Empty slot, or an entry closer to its home than the key would be: so the key is not in
+            if item is None or self.distance[position] < distance:
+                return -1
+            elif item[0] == key:  # found key
+                return position
+            else:  # there is something but not the key, try next
+                self.probe_total += 1
+                if distance + 1 > self.probe_max:
+                    self.probe_max = distance + 1
+                position = (position + 1) % len(self.table)
+        return -1
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Checks to see if the given key is in the Hash Table
+        :see: #self.__find(self, key: str)
+        """
+        return self.__find(key) >= 0
+
+    def __getitem__(self, key: str) -> T:
+        """
+        Get the item at a certain key
+        :see: #self.__find(self, key: str)
+        :raises KeyError: when the item doesn't exist
+        """
+        position = self.__find(key)
+        if position < 0:
+            raise KeyError(key)
+        return self.table[position][1]
+
+    def get(self, key: str, default: T = None) -> T:
+        """
+        Get the item at a certain key, or default when the key doesn't exist
+        :see: #self.__find(self, key: str)
+        """
+        position = self.__find(key)
+        if position < 0:
+            return default
+        return self.table[position][1]
+
+    def setdefault(self, key: str, default: T = None) -> T:
+        """
+        Get the item at a certain key, inserting default first when the key doesn't exist
+        :see: #self.__find(self, key: str)
+        """
+        position = self.__find(key)
+        if position >= 0:
+            return self.table[position][1]
+        self[key] = default
+        return default
+
+    def __setitem__(self, key: str, data: T) -> None:
+        """
+        Set an (key, data) pair in our hash table.
+        The key is looked for and inserted in the same pass: up to the first entry closer to its home than the key
+        would be, the key can only be in one of the slots passed over.
+        :complexity: O(K + D) where K is the size of the key and D the length of the cluster from its home slot
+        """
+        if self.max_load_factor is not None and self.count + 1 > self.max_load_factor * len(self.table) \
+                and key not in self:
+            self.rehash(max(2 * len(self.table), math.ceil((self.count + 1) / self.max_load_factor)))
+
+        position = self.hash(key)
+        distance = 0
+        for _ in range(len(self.table)):
+            item = self.table[position]
+            if item is None or self.distance[position] < distance:
+                break
+            elif item[0] == key:  # existing key, replace its data
+                self.table[position] = (key, data)
+                return
+            position = (position + 1) % len(self.table)
+            distance += 1
+            self.probe_total += 1
+        else:
+            raise ValueError("Cannot insert into a full table.")
+
+        if self.is_full():
+            raise ValueError("Cannot insert into a full table.")
+        if key not in self.hash_codes:  # hashed once, for as long as the key stays in the table
+            self.hash_codes[key] = self.hash_code(key)
+        self.count += 1
+        if distance > 0:
+            self.conflict_count += 1
+        # Rob from the rich: the entry being placed takes the slot of any entry closer to its home
+        item = (key, data)
+        while True:
+            if distance > self.probe_max:
+                self.probe_max = distance
+            if self.table[position] is None:
+                self.table[position] = item
+                self.distance[position] = distance
+                return
+            if self.distance[position] < distance:
+                item, self.table[position] = self.table[position], item
+                distance, self.distance[position] = self.distance[position], distance
+            position = (position + 1) % len(self.table)
+            distance += 1
+            self.probe_total += 1
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Remove key and its data from the hash table, moving every following entry of the cluster that is not in its
+        home slot one slot back (backward-shift deletion).
+        :complexity: O(K + C) where K is the size of the key and C the length of the cluster after it
+        :raises KeyError: when the key doesn't exist
+        """
+        hole = self.__find(key)
+        if hole < 0:
+            raise KeyError(key)
+        self.count -= 1
+        self.hash_codes.pop(key, None)
+        position = (hole + 1) % len(self.table)
+        while self.table[position] is not None and self.distance[position] > 0:
+            self.table[hole] = self.table[position]
+            self.distance[hole] = self.distance[position] - 1
+            hole = position
+            position = (position + 1) % len(self.table)
+        self.table[hole] = None
+        self.distance[hole] = None
+
+    def rehash(self, tablesize: int) -> None:
+        """
+        Move every entry into a new table of the smallest prime size that is at least tablesize.
+        Keys are not hashed again, their cached hash codes are reduced to the new size.
+        The statistics are counted again from the new layout.
+        :complexity: O(T + N) where T is the new table size and N the number of entries, when the clusters are short
+        """
+        entries = [item for item in self.table if item is not None]
+        self.conflict_count = 0
+        self.probe_total = 0
+        self.probe_max = 0
+        self.initalise_with_tablesize(primes.next_prime(tablesize))
+        for key, data in entries:
+            self[key] = data
+
+
+def displacement_statistics(table: LinearProbePotionTable) -> tuple:
+    """
+    Returns (mean, variance, maximum) of the distance of every entry of table from its home slot.
+    Works for any open addressing table with a hash method.
+    :complexity: O(T) where T is the table size
+    """
+    distances = []
+    for position in range(len(table.table)):
+        if table.table[position] is not None:
+            distances.append((position - table.hash(table.table[position][0])) % len(table.table))
+    if not distances:
+        return 0, 0, 0
+    mean = sum(distances) / len(distances)
+    return mean, sum((distance - mean) ** 2 for distance in distances) / len(distances), max(distances)
+
+
+if __name__ == '__main__':
+    import time
+
+    def fill(table_class, names: list[str], good_hash: bool, tablesize: int):
+        table = table_class(len(names), good_hash, tablesize)
+        for name in names:
+            table[name] = name
+        return table
+
+    def report(label: str, table, seconds: float = None) -> None:
+        mean, variance, longest = displacement_statistics(table)
+        line = label + ": statistics " + str(table.statistics()) + ", displacement mean " + str(round(mean, 2)) + \
+            ", variance " + str(round(variance, 2)) + ", max " + str(longest)
+        if seconds is not None:
+            line += ", " + str(round(seconds, 3)) + " s"
+        print(line)
+
+    # The experiments of hash_table.py, same names and table sizes. "good" and "bad" hash are
+    # Potion.good_hash_code and bad_hash_code reduced modulo the table size, not Potion.good_hash
+    names_1 = LinearProbePotionTable(100).fake_data_generation(70)
+    for tablesize in [69, 100, 120, 200, 291]:
+        for good_hash in [True, False]:
+            for table_class in [LinearProbePotionTable, RobinHoodPotionTable]:
+                try:
+                    table = fill(table_class, names_1, good_hash, tablesize)
+                except ValueError:
+                    print(table_class.__name__, tablesize, "good" if good_hash else "bad", "hash: table full")
+                    continue
+                report(table_class.__name__ + ", table size " + str(tablesize) + ", " +
+                       ("good" if good_hash else "bad") + " hash", table)
+
+    # Much larger tables at load factor 1/2 (good hash) and 0.9 (skewed names, few distinct words)
+    words = ["health", "haste", "mana", "might", "vision", "venom", "stone", "speed"]
+    for num_potions in [10 ** 4, 10 ** 5]:
+        numbered = ["Potion of " + str(x) for x in range(num_potions)]
+        skewed = ["Potion of " + words[x % len(words)] + " " + str(x // len(words)) for x in range(num_potions)]
+        for label, names, tablesize in [("numbered", numbered, 2 * num_potions + 1),
+                                        ("skewed", skewed, int(num_potions / 0.9) + 1)]:
+            for table_class in [LinearProbePotionTable, RobinHoodPotionTable]:
+                start = time.perf_counter()
+                table = fill(table_class, names, True, tablesize)
+                for name in names:
+                    table[name]
+                for name in names:
+                    name + "?" in table
+                report(table_class.__name__ + ", " + str(num_potions) + " " + label + " names, table size " +
+                       str(tablesize), table, time.perf_counter() - start)
@@ -0,0 +1,75 @@
+""" Scenario Runner
+
+Runs many independent Game scenarios across a pool of worker processes.
+A scenario is a dictionary with:
+
+    seed: seed of the scenario's RandomGen (defaults to 0)
+    days: list of day events, see day_pipeline.simulate_days
+    mode: solve_game mode (defaults to "prefix")
+
+Every scenario is played on a fresh Game(seed=seed) built from the shared
+potion catalog, so the results are exactly those of a serial run.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from concurrent.futures import ProcessPoolExecutor
+
+from day_pipeline import simulate_days
+from game import Game
+
+# Potion catalog of the current worker process, set once by init_worker
+worker_potion_data = None
+
+
+def init_worker(potion_data: list) -> None:
+    """
+    Process pool initialiser, receives the potion catalog once per worker instead of once per scenario.
+    :complexity: O(1)
+    """
+    global worker_potion_data
+    worker_potion_data = potion_data
+
+
+def run_scenario(scenario: dict) -> list[tuple[int, list, list]]:
+    """
+    Play one scenario against the worker's potion catalog.
+    Returns the (day, vendor inventory, profits) of each day.
+    :complexity: O(N) to build the catalog plus the work of every day, where N is the size of the catalog
+    """
+    game = Game(seed=scenario.get("seed", 0))
+    game.set_total_potion_data(worker_potion_data)
+    return list(simulate_days(game, scenario["days"], mode=scenario.get("mode", "prefix")))
+
+
+def run_scenarios(potion_data: list, scenarios: list[dict], max_workers: int = None,
+                  chunksize: int = 16) -> list[list[tuple[int, list, list]]]:
+    """
+    Play every scenario, spread across max_workers processes in chunks of chunksize scenarios.
+    Results come back in the same order as scenarios. max_workers=1 runs everything in this process.
+    """
+    if max_workers == 1:
+        init_worker(potion_data)
+        return [run_scenario(scenario) for scenario in scenarios]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(potion_data,)) as executor:
+        return list(executor.map(run_scenario, scenarios, chunksize=chunksize))
+
+
+if __name__ == '__main__':
+    import time
+
+    catalog = [("Buff", "Potion of " + str(x), x) for x in range(1, 501)]
+    monte_carlo = [
+        {"seed": seed,
+         "days": [{"inventory": [("Potion of " + str(x), (x * seed) % 7 + 1) for x in range(1, 501)],
+                   "vendors": 50,
+                   "valuations": [("Potion of " + str(x), x + (x * seed) % 5 + x / 1024) for x in range(1, 501)],
+                   "budgets": [100, 1000, 10000]}]}
+        for seed in range(50)
+    ]
+    for workers in [1, None]:
+        start = time.perf_counter()
+        run_scenarios(catalog, monte_carlo, max_workers=workers)
+        print("max_workers=" + str(workers) + ":", round(time.perf_counter() - start, 3), "s")
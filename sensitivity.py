@@ -0,0 +1,81 @@
+""" Sensitivity Analysis
+
+Answers solve_game for many perturbations of one valuation set ("adventurers pay 10% more for Buff potions")
+without redoing the work the scenarios share:
+
+    - every valuation is looked up in the hash table once, and grouped by potion type
+    - each potion type is ranked once per distinct price factor, so a scenario that only changes one type only
+      sorts that type, and the other types reuse their ranking
+    - the rankings of all types are merged into a BudgetCurve in O(N * log(T)) instead of N AVL insertions
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import heapq
+
+from budget_curve import BudgetCurve
+
+
+class SensitivityAnalysis:
+    """
+    Sensitivity Analysis
+
+    attributes:
+        categories: K = potion type, I = list of (Potion, price paid by adventurers) of the valuations of that type
+        rankings: K = (potion type, price factor), I = profitable valuations of that type with the prices multiplied
+                  by the factor, as ((profit, -buy price), Potion, price) from the most profitable one
+    """
+
+    def __init__(self, hash_table, potion_valuations: list[tuple[str, float]]) -> None:
+        """
+        :complexity: O(N) where N is the length of potion_valuations
+        """
+        self.categories = {}
+        self.rankings = {}
+        for name, price in potion_valuations:
+            pot = hash_table.get(name)  # O(1) one probe, None when the potion is not in the catalog
+            if pot is not None:
+                self.categories.setdefault(pot.potion_type, []).append((pot, price))
+
+    def ranking(self, category, factor: float) -> list[tuple]:
+        """
+        Ranking of one potion type with its prices multiplied by factor, the same order as Game.build_profit_map.
+        :complexity: O(C * log(C)) where C is the number of valuations of that type, O(1) after the first call
+        """
+        key = (category, factor)
+        if key not in self.rankings:
+            ranked = []
+            for pot, price in self.categories[category]:
+                price = price * factor
+                profit = price - pot.buy_price
+                if profit > 0:
+                    ranked.append(((profit, -pot.buy_price), pot, price))
+            ranked.sort(key=lambda entry: entry[0], reverse=True)
+            self.rankings[key] = ranked
+        return self.rankings[key]
+
+    def curve(self, perturbation: dict) -> BudgetCurve:
+        """
+        BudgetCurve of the valuations with the prices of every potion type in perturbation multiplied by its factor.
+        Potion types missing from perturbation keep their prices.
+        :complexity: O(N * log(T)) where T is the number of potion types, plus the rankings not computed yet
+        """
+        rankings = [self.ranking(category, perturbation.get(category, 1)) for category in self.categories]
+        curve = BudgetCurve()
+        for _, pot, price in heapq.merge(*rankings, key=lambda entry: entry[0], reverse=True):
+            curve.append(pot.quantity, pot.buy_price, price)
+        return curve
+
+    def solve(self, perturbations: list[dict], starting_money: list[int]) -> list[list[float]]:
+        """
+        Returns one row per perturbation, holding the revenue for every starting money,
+        rounded like Game.solve_game.
+        :complexity: O(P * (N * log(T) + M * log(N))) where P is the number of perturbations and M the length of
+                     starting_money, plus the rankings
+        """
+        matrix = []
+        for perturbation in perturbations:
+            curve = self.curve(perturbation)
+            matrix.append([round(curve.revenue(budget), 1) for budget in starting_money])
+        return matrix
@@ -0,0 +1,201 @@
+""" Session Server
+
+Serves many Game sessions from one asyncio event loop. Commands arrive as JSON
+lines, either on stdin or on a local unix socket:
+
+    {"id": 1, "session": "alice", "op": "create", "args": [seed]}
+    {"id": 2, "session": "alice", "op": "solve_game", "args": [valuations, starting_money]}
+    {"id": 3, "session": "alice", "op": "close"}
+
+and every command gets one JSON line back, {"id": ..., "result": ...} or
+{"id": ..., "error": ...}. Commands of one session run one at a time in the
+order they arrived, commands of different sessions interleave freely. Heavy
+commands run on a worker pool so they never block the event loop.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import asyncio
+import functools
+import json
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable
+
+from game import Game
+
+# Game methods a session may call
+SESSION_COMMANDS = ("set_total_potion_data", "add_potions_to_inventory", "restock", "withdraw",
+                    "choose_potions_for_vendors", "solve_game", "update_valuation", "remove_valuation",
+                    "solve_valuations")
+# Game methods sent to the worker pool instead of running on the event loop
+HEAVY_COMMANDS = ("set_total_potion_data", "solve_game", "solve_valuations")
+
+
+def error_response(command: dict, error: Exception) -> dict:
+    return {"id": command.get("id"), "error": type(error).__name__ + ": " + str(error)}
+
+
+def command_error(command) -> str:
+    """
+    Error message for a decoded JSON line that is not a command the server can run, None for a command.
+    Session ids are JSON scalars, so they can key the sessions and their locks.
+    """
+    if not isinstance(command, dict):
+        return "TypeError: a command is a JSON object, not " + type(command).__name__
+    session = command.get("session")
+    if session is not None and not isinstance(session, (str, int, float, bool)):
+        return "TypeError: a session id is a string or a number, not " + type(session).__name__
+    return None
+
+
+class SessionServer:
+    """
+    Session Server
+
+    attributes:
+        sessions: K = session id, I = Game
+        locks: K = session id, I = asyncio.Lock, keeps the commands of a session in order. A session keeps its lock
+               across close and create for as long as commands hold or wait for it
+        waiting: K = session id, I = number of commands holding or waiting for its lock
+        executor: worker pool for HEAVY_COMMANDS
+    """
+
+    def __init__(self, executor: Executor = None, max_workers: int = 4) -> None:
+        self.sessions = {}
+        self.locks = {}
+        self.waiting = {}
+        # Game objects live in this process, so the pool shares memory with it
+        self.executor = executor if executor is not None else ThreadPoolExecutor(max_workers=max_workers)
+
+    async def handle(self, command: dict, respond: Callable[[dict], None] = None) -> dict:
+        """
+        Run one command and return its response. respond, if given, is called with the response
+        while the session is still locked, so responses of a session go out in order.
+        """
+        error = command_error(command)
+        if error is not None:  # answered like a line that is not JSON, nothing to lock
+            response = {"id": command.get("id") if isinstance(command, dict) else None, "error": error}
+            if respond is not None:
+                respond(response)
+            return response
+        session = command.get("session")
+        if session not in self.locks:
+            if command.get("op") != "create":  # nothing to keep in order, and no lock left behind for it
+                response = error_response(command, KeyError("No session named " + str(session)))
+                if respond is not None:
+                    respond(response)
+                return response
+            self.locks[session] = asyncio.Lock()  # FIFO, so arrival order is kept
+        self.waiting[session] = self.waiting.get(session, 0) + 1
+        try:
+            async with self.locks[session]:
+                try:
+                    response = {"id": command.get("id"), "result": await self.run(command)}
+                except Exception as e:
+                    response = error_response(command, e)
+                if respond is not None:
+                    respond(response)
+        finally:
+            self.waiting[session] -= 1
+            if self.waiting[session] == 0:  # the lock is only dropped once no command holds or waits for it
+                del self.waiting[session]
+                if session not in self.sessions:
+                    del self.locks[session]
+        return response
+
+    async def run(self, command: dict):
+        session = command.get("session")
+        op = command.get("op")
+        args = command.get("args", [])
+
+        if op == "create":
+            self.sessions[session] = Game(*args)
+            return None
+        if op == "close":
+            del self.sessions[session]  # its lock goes once the commands queued behind this one are done
+            return None
+        if op not in SESSION_COMMANDS:
+            raise ValueError("Unknown command: " + str(op))
+        if session not in self.sessions:
+            raise KeyError("No session named " + str(session))
+
+        method = getattr(self.sessions[session], op)
+        if op in HEAVY_COMMANDS:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(method, *args))
+        return method(*args)
+
+    async def serve_stream(self, reader: asyncio.StreamReader, write: Callable[[str], None]) -> None:
+        """
+        Read JSON line commands from reader until EOF, writing one JSON line response per command.
+        Every command is started as soon as its line is read.
+        """
+        def respond(response: dict) -> None:
+            write(json.dumps(response) + "\n")
+
+        pending = set()
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                command = json.loads(line)
+            except ValueError as e:
+                respond({"id": None, "error": "ValueError: " + str(e)})
+                continue
+            task = asyncio.create_task(self.handle(command, respond))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        """
+        Accept connections on a local unix socket, each one is a stream of commands.
+        """
+        async def connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            await self.serve_stream(reader, lambda line: writer.write(line.encode()))
+            try:
+                await writer.drain()
+            except ConnectionError:  # the client went away before reading every response
+                pass
+            writer.close()
+
+        return await asyncio.start_unix_server(connection, path=path)
+
+    async def serve_stdio(self) -> None:
+        """
+        Read commands from stdin and write responses to stdout.
+        """
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        def write(line: str) -> None:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+        await self.serve_stream(reader, write)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+if __name__ == '__main__':
+    server = SessionServer()
+    if len(sys.argv) > 1:
+        async def main() -> None:
+            unix_server = await server.serve_unix(sys.argv[1])
+            async with unix_server:
+                await unix_server.serve_forever()
+    else:
+        async def main() -> None:
+            await server.serve_stdio()
+    try:
+        asyncio.run(main())
+    finally:
+        server.shutdown()
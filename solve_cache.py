@@ -0,0 +1,77 @@
+""" Solve Cache
+
+Bounded least-recently-used cache of Game.solve_game results.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from collections import OrderedDict
+
+
+def valuation_fingerprint(potion_valuations: list[tuple[str, float]]) -> tuple:
+    """
+    Hashable fingerprint of a valuation list. The whole list is kept rather than a hash of it,
+    so two different valuation lists can never share a cache entry.
+    :complexity: O(N) where N is the length of potion_valuations
+    """
+    return tuple((name, price) for name, price in potion_valuations)
+
+
+class SolveCache:
+    """
+    Solve Cache
+
+    attributes:
+        maxsize: number of results kept before the least recently used one is evicted
+        entries: cached results, least recently used first
+        hits: number of lookups answered from the cache
+        misses: number of lookups that were not
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """
+        Returns the number of cached results
+        :complexity: O(1)
+        """
+        return len(self.entries)
+
+    def get(self, key: tuple):
+        """
+        Returns the result cached under key (marking it as recently used), or None
+        :complexity: O(K) where K is the size of the key, to hash it
+        """
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple, result) -> None:
+        """
+        Cache result under key, evicting the least recently used result when full
+        :complexity: O(K) where K is the size of the key, to hash it
+        """
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Drop every cached result, keeping the counters
+        :complexity: O(S) where S is the number of cached results
+        """
+        self.entries.clear()
+
+    def statistics(self) -> tuple:
+        return self.hits, self.misses, len(self.entries)
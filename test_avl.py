@@ -61,6 +61,27 @@ class TestAVL(unittest.TestCase):
         self.b[22] = "H"
         self.assertEqual([self.b.kth_largest(x).key for x in range(1, 9)], [22, 20, 17, 15, 10, 5, 4, 3])
 
+    def test_duplicates(self):
+        self.b = AVLTree()
+        self.b[1] = "A"
+        self.assertRaises(ValueError, self.b.__setitem__, 1, "B")
+
+        self.b = AVLTree(allow_duplicates=True)
+        for key, item in [(5, "A"), (3, "B"), (5, "C"), (8, "D"), (5, "E"), (3, "F"), (5, "G")]:
+            self.b[key] = item
+        self.assertEqual(len(self.b), 7)
+        # Equal keys come out of kth_largest in insertion order
+        self.assertEqual([self.b.kth_largest(x).item for x in range(1, 8)], ["D", "A", "C", "E", "G", "B", "F"])
+        del self.b[8]
+        del self.b[5]
+        del self.b[5]
+        self.assertEqual(len(self.b), 4)
+        self.assertEqual([self.b.kth_largest(x).key for x in range(1, 5)], [5, 5, 3, 3])
+        items = [self.b.kth_largest(x).item for x in range(1, 5)]
+        # Two of the four items under key 5 are left, every item under key 3 is kept
+        self.assertTrue(set(items[:2]) < {"A", "C", "E", "G"})
+        self.assertEqual(items[2:], ["B", "F"])
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestAVL)
@@ -0,0 +1,53 @@
+import json
+import unittest
+
+from benchmark import (BASELINE_PATH, DEFAULT_SIZES, MIN_P99_SAMPLES, compare_to_baseline, make_workload, percentile,
+                       run_benchmarks, time_method)
+from game import Game
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_workload(self):
+        work = make_workload(50, seed=3)
+        self.assertEqual(work, make_workload(50, seed=3))
+        self.assertEqual(len(work["potion_data"]), 50)
+        self.assertEqual(len({row[2] for row in work["potion_data"]}), 50)
+        # Every solver mode agrees on the generated workload
+        g = Game()
+        g.set_total_potion_data(work["potion_data"])
+        g.add_potions_to_inventory(work["inventory"])
+        self.assertEqual(g.solve_game(work["valuations"], work["budgets"], mode="kth"),
+                         g.solve_game(work["valuations"], work["budgets"], mode="prefix"))
+
+    def test_report_and_baseline(self):
+        self.assertEqual(percentile([3, 1, 2, 4], 0.5), 2)
+        self.assertEqual(percentile([3, 1, 2, 4], 0.99), 4)
+        report = run_benchmarks([20], repeats=2)
+        methods = report["results"]["20"]
+        for method in ["set_total_potion_data", "add_potions_to_inventory", "restock", "withdraw",
+                       "choose_potions_for_vendors", "solve_game[prefix]", "solve_game[heap]", "solve_game[kth]",
+                       "update_valuation", "solve_valuations", "save", "load"]:
+            self.assertEqual(methods[method]["calls"], 2)
+            self.assertGreaterEqual(methods[method]["max"], methods[method]["p50"])
+            # Two samples are not enough for a p99
+            self.assertNotIn("p99", methods[method])
+        self.assertIn("p99", time_method(1, lambda: None, repeats=MIN_P99_SAMPLES))
+        self.assertEqual(compare_to_baseline(report, report), [])
+        faster = {"results": {"20": {"save": dict(methods["save"], p50=methods["save"]["p50"] / 2)}}}
+        self.assertEqual([regression[:3] for regression in compare_to_baseline(report, faster)],
+                         [("20", "save", "p50")])
+
+    def test_baseline(self):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+        self.assertEqual(sorted(baseline["results"]), sorted(str(size) for size in DEFAULT_SIZES))
+        for size, methods in baseline["results"].items():
+            self.assertIn("solve_game[prefix]", methods)
+            self.assertTrue(all(timing["calls"] == baseline["meta"]["repeats"] for timing in methods.values()))
+        self.assertEqual(compare_to_baseline(baseline, baseline), [])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBenchmark)
+    unittest.TextTestRunner(verbosity=0).run(suite)
@@ -0,0 +1,64 @@
+import json
+import unittest
+
+from budget_curve import BudgetCurve, np
+from game import Game
+
+
+class TestBudgetCurve(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.game = Game()
+        self.game.set_total_potion_data([(str(x), str(x), x) for x in range(1, 31)])
+        self.game.add_potions_to_inventory([(str(x), x % 3) for x in range(1, 31)])
+        self.valuations = [(str(x), x + (x * 7) % 5) for x in range(1, 31)]
+
+    def test_matches_solve_game(self):
+        curve = self.game.budget_curve(self.valuations)
+        budgets = [0, 1, 7.5, 60, 250, 10 ** 5]
+        self.assertEqual([round(curve.revenue(budget), 1) for budget in budgets],
+                         self.game.solve_game(self.valuations, budgets, mode="prefix"))
+        corners = curve.breakpoints()
+        self.assertEqual(corners[0], (0, 0))
+        self.assertEqual(len(corners), len(curve) + 1)
+        self.assertEqual(corners[-1][1], curve.revenue(10 ** 5))
+
+    @unittest.skipUnless(np is not None, "NumPy is not installed")
+    def test_revenue_many(self):
+        curve = self.game.budget_curve(self.valuations)
+        self.assertTrue(any(cost == 0 for cost in curve.costs))  # zero quantity potions are ranked too
+        # Exactly on every breakpoint, between them, and past clearing the whole stock
+        budgets = list(curve.cumulative_cost) + [cost + 0.5 for cost in curve.cumulative_cost]
+        budgets += [curve.cumulative_cost[-1] * 2, 10 ** 6]
+        revenues = curve.revenue_many(budgets)
+        self.assertIsInstance(revenues, np.ndarray)
+        for budget, revenue in zip(budgets, revenues):
+            self.assertAlmostEqual(float(revenue), curve.revenue(budget))
+        self.assertEqual(list(BudgetCurve().revenue_many([0, 5])), [0, 0])
+
+    def test_budget_for(self):
+        curve = self.game.budget_curve(self.valuations)
+        for budget in [0, 2, 7.5, 60, 99.25, curve.cumulative_cost[-1]]:
+            self.assertAlmostEqual(curve.budget_for(curve.revenue(budget)), budget)
+        # Smallest budget for a corner: zero quantity potions add nothing
+        self.assertEqual(curve.budget_for(curve.cumulative_revenue[3]), curve.cumulative_cost[3])
+        self.assertRaises(ValueError, curve.budget_for, curve.cumulative_revenue[-1] + 1)
+
+    def test_serialise(self):
+        curve = self.game.budget_curve(self.valuations)
+        copy = BudgetCurve.from_dict(json.loads(json.dumps(curve.to_dict())))
+        self.assertEqual(copy.breakpoints(), curve.breakpoints())
+        for budget in [0, 3.3, 77, 10 ** 4]:
+            self.assertEqual(copy.revenue(budget), curve.revenue(budget))
+        # Without valuations the curve comes from the valuation book, as a copy
+        for name, price in self.valuations:
+            self.game.update_valuation(name, price)
+        book = self.game.budget_curve()
+        self.assertEqual(book.breakpoints(), curve.breakpoints())
+        book.append(1, 1, 2)
+        self.assertEqual(self.game.solve_valuations([10 ** 5]), [round(curve.revenue(10 ** 5), 1)])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBudgetCurve)
+    unittest.TextTestRunner(verbosity=0).run(suite)
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+from game import Game
+from potion import Potion
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "game.bin")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        g = Game(seed=11)
+        g.set_total_potion_data([
+            (["Health", "Buff", "Damage"][x % 3], "Potion of " + str(x), x)
+            for x in range(1, 81)
+        ])
+        g.add_potions_to_inventory([("Potion of " + str(x), x % 6 + 1) for x in range(1, 81, 2)])
+        g.restock([("Potion of 4", 2.5)])
+        g.choose_potions_for_vendors(7)
+        for x in range(1, 30):
+            g.update_valuation("Potion of " + str(x), x + x % 4 - 1)
+        g.update_valuation("Potion of Nothing", 3)
+        g.save(self.path)
+
+        # Same slots in the hash table, without hashing any name
+        saved = Potion.good_hash_code
+        Potion.good_hash_code = None
+        try:
+            loaded = Game.load(self.path)
+        finally:
+            Potion.good_hash_code = saved
+        self.assertEqual([loaded.hash_table.table[i] is None for i in range(len(g.hash_table.table))],
+                         [g.hash_table.table[i] is None for i in range(len(g.hash_table.table))])
+        self.assertEqual(loaded.hash_table.statistics(), g.hash_table.statistics())
+        self.assertEqual(loaded.hash_table.hash_codes, g.hash_table.hash_codes)
+        self.assertEqual(loaded.hash_table["Potion of 4"].quantity, 2.5)
+        self.assertEqual(loaded.hash_table["Potion of 5"].potion_type, "Damage")
+        self.assertEqual([key for key in loaded.stock], [key for key in g.stock])
+        self.assertEqual(loaded.valuations, g.valuations)
+        # The RandomGen carries on where it was
+        self.assertEqual(loaded.choose_potions_for_vendors(10), g.choose_potions_for_vendors(10))
+        self.assertEqual(loaded.solve_valuations([1, 10, 100, 1000]), g.solve_valuations([1, 10, 100, 1000]))
+        valuations = [("Potion of " + str(x), x + 2) for x in range(1, 81)]
+        self.assertEqual(loaded.solve_game(valuations, [5, 50], mode="prefix"),
+                         g.solve_game(valuations, [5, 50], mode="prefix"))
+        # Loaded games keep working as usual
+        loaded.restock([("Potion of 2", 1)])
+        loaded.update_valuation("Potion of 2", 10)
+        self.assertEqual(loaded.hash_table["Potion of 2"].quantity, 1)
+
+    def test_empty_and_invalid(self):
+        Game(seed=4).save(self.path)
+        loaded = Game.load(self.path)
+        self.assertIsNone(loaded.hash_table)
+        self.assertIsNone(loaded.stock)
+        self.assertEqual(loaded.rand.randint(100), Game(seed=4).rand.randint(100))
+        with open(self.path, "wb") as f:
+            f.write(b"not a checkpoint at all, not even close to one")
+        self.assertRaises(ValueError, Game.load, self.path)
+
+    def test_truncated(self):
+        g = Game(seed=2)
+        g.set_total_potion_data([("Health", "Potion of " + str(x), x) for x in range(1, 21)])
+        g.add_potions_to_inventory([("Potion of " + str(x), 2) for x in range(1, 21, 3)])
+        g.update_valuation("Potion of 4", 9)
+        g.save(self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for length in [0, 1, 20, len(data) // 2, len(data) - 1]:
+            with open(self.path, "wb") as f:
+                f.write(data[:length])
+            self.assertRaises(ValueError, Game.load, self.path)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCheckpoint)
+    unittest.TextTestRunner(verbosity=0).run(suite)
@@ -0,0 +1,60 @@
+import unittest
+
+from columnar_catalog import ColumnarCatalog
+from game import Game
+
+
+class TestColumnarCatalog(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.potion_data = [
+            ["Health", "Potion of Health Regeneration", 20],
+            ["Buff", "Potion of Extreme Speed", 10],
+            ["Damage", "Potion of Deadly Poison", 45],
+            ["Health", "Potion of Instant Health", 5],
+            ["Buff", "Potion of Increased Stamina", 25],
+            ["Damage", "Potion of Untenable Odour", 1]
+        ]
+        self.inventory = [
+            ("Potion of Health Regeneration", 4),
+            ("Potion of Extreme Speed", 5),
+            ("Potion of Instant Health", 3),
+            ("Potion of Increased Stamina", 10),
+            ("Potion of Untenable Odour", 5),
+        ]
+
+    def test_views(self):
+        c = ColumnarCatalog.from_potion_data(self.potion_data)
+        self.assertEqual(len(c), 6)
+        self.assertEqual(c.types, ["Health", "Buff", "Damage"])
+        self.assertTrue("Potion of Deadly Poison" in c)
+        self.assertFalse("Potion of Nothing" in c)
+        p = c["Potion of Instant Health"]
+        self.assertEqual((p.potion_type, p.name, p.buy_price, p.quantity), ("Health", "Potion of Instant Health", 5, 0))
+        p.quantity = 3
+        self.assertEqual(c.quantities[c.ids["Potion of Instant Health"]], 3)
+        c.restock([("Potion of Instant Health", 2), ("Potion of Nothing", 1)])
+        self.assertEqual(c.view(p.id).quantity, 5)
+
+    def test_solve(self):
+        c = ColumnarCatalog.from_potion_data(self.potion_data)
+        c.restock(self.inventory)
+        valuations = [
+            ("Potion of Health Regeneration", 30),
+            ("Potion of Extreme Speed", 15),
+            ("Potion of Instant Health", 15),
+            ("Potion of Increased Stamina", 20),
+        ]
+        self.assertEqual(c.solve(valuations, [12.5, 45, 80]), [37.5, 90, 142.5])
+
+        g = Game()
+        g.set_total_potion_data(self.potion_data)
+        g.add_potions_to_inventory(self.inventory)
+        valuations.append(("Potion of Untenable Odour", 4.5))
+        budgets = [0, 1, 17, 99.5, 1000]
+        self.assertEqual(c.solve(valuations, budgets), g.solve_game(valuations, budgets, mode="prefix"))
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestColumnarCatalog)
+    unittest.TextTestRunner(verbosity=0).run(suite)
@@ -0,0 +1,76 @@
+import io
+import json
+import unittest
+
+from day_pipeline import read_days, simulate_days
+from game import Game
+
+
+class TestDayPipeline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.potion_data = [
+            (str(x), str(x), x)
+            for x in range(1, 31)
+        ]
+        self.days = [
+            {"inventory": [(str(x), x % 4 + 1) for x in range(1, 31)],
+             "vendors": 5,
+             "valuations": [(str(x), x + x % 6) for x in range(1, 31, 2)],
+             "budgets": [10, 50]},
+            {"vendors": 3,
+             "valuation_updates": [("3", 10), ("4", 9)],
+             "budgets": [4, 20]},
+            {"inventory": [("4", 1)],
+             "valuation_updates": [("3", None)],
+             "budgets": [4, 20]},
+            {"restock": [("4", 1), ("5", 2)],
+             "withdraw": [("4", 2)],
+             "valuation_updates": [("5", 8)],
+             "budgets": [10]},
+        ]
+
+    def test_matches_manual_days(self):
+        g = Game()
+        g.set_total_potion_data(self.potion_data)
+        results = list(simulate_days(g, self.days))
+
+        manual = Game()
+        manual.set_total_potion_data(self.potion_data)
+        manual.add_potions_to_inventory(self.days[0]["inventory"])
+        vendors = manual.choose_potions_for_vendors(5)
+        profits = manual.solve_game(self.days[0]["valuations"], [10, 50], mode="prefix")
+        self.assertEqual(results[0], (0, vendors, profits))
+        vendors = manual.choose_potions_for_vendors(3)
+        manual.update_valuation("3", 10)
+        manual.update_valuation("4", 9)
+        self.assertEqual(results[1], (1, vendors, manual.solve_valuations([4, 20])))
+        self.assertEqual(results[1][2], [13.3, 49])
+        self.assertEqual(results[2], (2, [], [9, 9]))
+        # Potion 4 sold out, 2 litres of potion 5 bought for 10
+        self.assertEqual(results[3], (3, [], [16]))
+        self.assertEqual([key for key in g.stock], [5])
+
+    def test_lazy(self):
+        g = Game()
+        g.set_total_potion_data(self.potion_data)
+        read = []
+
+        def history():
+            lines = io.StringIO("\n".join(json.dumps(day) for day in self.days) + "\n\n")
+            for day in read_days(lines):
+                read.append(day)
+                yield day
+
+        stream = simulate_days(g, history())
+        self.assertEqual(next(stream)[0], 0)
+        # Only the first day has been read so far
+        self.assertEqual(len(read), 1)
+        self.assertEqual(len(g.valuations), 0)
+        self.assertEqual([day for day, _, _ in stream], [1, 2, 3])
+        self.assertEqual(len(read), 4)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestDayPipeline)
+    unittest.TextTestRunner(verbosity=0).run(suite)
@@ -0,0 +1,35 @@
+import unittest
+
+from differential import compare_size, diverge
+
+
+class TestDifferential(unittest.TestCase):
+
+    def test_diverge(self):
+        self.assertEqual(diverge([1.5, ("A", 2)], [1.5, ("A", 2)])["mismatches"], 0)
+        result = diverge([1.0, ("A", 2), 3.0], [1.25, ("B", 2)])
+        self.assertEqual(result["compared"], 3)
+        self.assertEqual(result["mismatches"], 3)
+        self.assertEqual(result["max_diff"], 1)
+        self.assertEqual(result["examples"][0], (0, 1.0, 1.25))
+        self.assertEqual(result["examples"][2], (2, 3.0, None))
+
+    def test_compare_size(self):
+        result = compare_size(60, repeats=2, max_budgets=10)
+        # Both implementations stock and choose vendors the same way
+        self.assertEqual(result["divergence"]["stock"]["mismatches"], 0)
+        self.assertEqual(result["divergence"]["choose_potions_for_vendors"]["mismatches"], 0)
+        self.assertEqual(result["digests"]["game"]["choose_potions_for_vendors"],
+                         result["digests"]["game_holder"]["choose_potions_for_vendors"])
+        # but not solve_game (game_holder.py sums profits instead of revenue)
+        self.assertGreater(result["divergence"]["solve_game"]["mismatches"], 0)
+        self.assertNotEqual(result["digests"]["game"]["solve_game"], result["digests"]["game_holder"]["solve_game"])
+        for method in ["set_total_potion_data", "add_potions_to_inventory", "choose_potions_for_vendors",
+                       "solve_game"]:
+            self.assertEqual(result["timing"][method]["game"]["calls"], 2)
+        self.assertEqual(compare_size(60, repeats=2, max_budgets=10)["digests"], result["digests"])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestDifferential)
+    unittest.TextTestRunner(verbosity=0).run(suite)
@@ -0,0 +1,26 @@
+import unittest
+
+from fenwick_tree import FenwickTree
+
+
+class TestFenwickTree(unittest.TestCase):
+
+    def test_prefix_sum(self):
+        f = FenwickTree(10)
+        f.add(3)
+        f.add(7, 2)
+        f.add(10)
+        self.assertEqual([f.prefix_sum(x) for x in range(0, 11)], [0, 0, 0, 1, 1, 1, 1, 3, 3, 3, 4])
+        self.assertRaises(IndexError, f.add, 11)
+
+    def test_kth_free(self):
+        f = FenwickTree(9)
+        for position in [1, 4, 5, 9]:
+            f.add(position)
+        self.assertEqual([f.kth_free(k) for k in range(1, 6)], [2, 3, 6, 7, 8])
+        self.assertRaises(ValueError, f.kth_free, 6)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestFenwickTree)
+    unittest.TextTestRunner(verbosity=0).run(suite)
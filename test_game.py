@@ -1,6 +1,10 @@
+import os
+import tempfile
 import unittest
 
+import game_holder
 from game import Game
+from game_metrics import instrumented
 
 
 class TestGame(unittest.TestCase):
@@ -25,6 +29,26 @@ class TestGame(unittest.TestCase):
         # Vendor Selection gives unique results
         self.assertTrue(len(set(res)) == len(set(res2)) == 99)
 
+    def test_choose_vendors_same_picks(self):
+        # Same picks as deleting each choice from the AVL tree and reinserting them afterwards
+        for seed in [0, 1, 42]:
+            games = [Game(seed=seed), game_holder.Game(seed=seed)]
+            for g in games:
+                g.set_total_potion_data([
+                    (str(x), str(x), x)
+                    for x in range(1, 201)
+                ])
+                g.add_potions_to_inventory([
+                    (str(x), x)
+                    for x in range(1, 201, 3)
+                ])
+            stock = [key for key in games[0].stock]
+            for num_vendors in [1, 10, 67]:
+                self.assertEqual(games[0].choose_potions_for_vendors(num_vendors),
+                                 games[1].choose_potions_for_vendors(num_vendors))
+            # The stock was never touched
+            self.assertEqual([key for key in games[0].stock], stock)
+
     def test_example(self):
         G = Game()
         # There are these potions, with these stats, available over the course of the game.
@@ -59,6 +83,286 @@ class TestGame(unittest.TestCase):
         results = G.solve_game(full_vendor_info, [12.5, 45, 80])
         self.assertEqual(results, [37.5, 90, 142.5])
 
+    def test_solve_is_deterministic(self):
+        # Health Regeneration and Instant Health tie on profit, the cheaper Instant Health is bought first
+        for seed in range(5):
+            g = Game(seed=seed)
+            g.set_total_potion_data([
+                ["Health", "Potion of Health Regeneration", 20],
+                ["Health", "Potion of Instant Health", 5],
+            ])
+            g.add_potions_to_inventory([
+                ("Potion of Health Regeneration", 4),
+                ("Potion of Instant Health", 3),
+            ])
+            valuations = [("Potion of Health Regeneration", 30), ("Potion of Instant Health", 15)]
+            self.assertEqual(g.solve_game(valuations, [12.5, 80], mode="prefix"), [37.5, 142.5])
+            # Solving does not draw from the RandomGen
+            self.assertEqual(g.rand.randint(100), Game(seed=seed).rand.randint(100))
+        # The same potion valued twice no longer risks a duplicate key
+        self.assertEqual(len(g.build_profit_map(valuations + valuations)), 4)
+
+    def test_prefix_mode(self):
+        results = []
+        for mode in ["kth", "prefix", "heap"]:
+            g = Game(seed=7)
+            g.set_total_potion_data([
+                (str(x), str(x), x)
+                for x in range(1, 61)
+            ])
+            g.add_potions_to_inventory([
+                (str(x), x % 7 + 1)
+                for x in range(1, 61)
+            ])
+            valuations = [(str(x), x + (x * 13) % 11 + 1) for x in range(1, 61)]
+            results.append(g.solve_game(valuations, [0, 1, 12.5, 100, 333.3, 1000, 2500], mode=mode))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+        # Every solver answers each starting money once, also those that clear the whole stock
+        g = Game()
+        g.set_total_potion_data([["Health", "Potion of Instant Health", 5], ["Buff", "Potion of Extreme Speed", 10]])
+        g.add_potions_to_inventory([("Potion of Instant Health", 3), ("Potion of Extreme Speed", 2)])
+        valuations = [("Potion of Instant Health", 15), ("Potion of Extreme Speed", 8)]
+        for mode in ["kth", "prefix", "heap"]:
+            self.assertEqual(g.solve_game(valuations, [10, 100, 15, 10 ** 6], mode=mode), [30, 45, 45, 45])
+
+    def test_heap_mode(self):
+        g = Game()
+        g.set_total_potion_data([(str(x), str(x), x) for x in range(1, 101)])
+        g.add_potions_to_inventory([(str(x), x % 4) for x in range(1, 101)])
+        valuations = [(str(x), x + (x * 17) % 9) for x in range(1, 101)] + [("1", 50), ("missing", 10)]
+        # Starting money in any order, repeated, zero or clearing the whole stock
+        budgets = [700, 0, 15.5, 700, 3, 10 ** 6, 42]
+        self.assertEqual(g.solve_game(valuations, budgets, mode="heap"),
+                         g.solve_game(valuations, budgets, mode="prefix"))
+        self.assertEqual(g.solve_game([], [5], mode="heap"), [0])
+        # auto picks the heap solver for a few starting money values only
+        metrics = g.enable_metrics()
+        g.solve_game(valuations, budgets)
+        self.assertEqual(metrics.calls["solve_with_heap"], 1)
+        g.solve_game(valuations, list(range(1, 18)))
+        self.assertEqual(metrics.calls["solve_with_heap"], 1)
+        self.assertEqual(metrics.calls["solve_with_kth_largest"], 1)
+        self.assertRaises(ValueError, g.solve_game, valuations, budgets, "lazy")
+
+    def test_auto_mode(self):
+        # auto switches solver past LAZY_MAX_BUDGETS starting money values, the answers must not change
+        g = Game()
+        g.set_total_potion_data([["A", "A", 20], ["B", "B", 10], ["C", "C", 5], ["D", "D", 50]])
+        g.add_potions_to_inventory([("A", 4), ("B", 5), ("C", 3), ("D", 1)])
+        valuations = [("A", 30), ("B", 16), ("C", 15)]
+        self.assertEqual(g.solve_game(valuations, [1000] * 16), [245] * 16)
+        self.assertEqual(g.solve_game(valuations, [1000] * 17), [245] * 17)
+        self.assertEqual(g.solve_game(valuations, [1000]), [245])
+        # An unprofitable valuation is never ranked
+        valuations.append(("D", 40))
+        self.assertEqual(g.solve_game(valuations, [10 ** 6] * 17), [245] * 17)
+        self.assertEqual(g.solve_game(valuations, [10 ** 6]), [245])
+        budgets = [0, 7.5, 40, 100, 150, 10 ** 6]
+        self.assertEqual(g.solve_game(valuations, budgets * 3), g.solve_game(valuations, budgets) * 3)
+
+    def test_vectorized(self):
+        results = []
+        for solver in ["prefix", "vectorized"]:
+            g = Game(seed=3)
+            g.set_total_potion_data([
+                (str(x), str(x), x)
+                for x in range(1, 41)
+            ])
+            g.add_potions_to_inventory([
+                (str(x), x % 5 + 1)
+                for x in range(1, 41)
+            ])
+            valuations = [(str(x), x + (x * 7) % 13) for x in range(1, 41)]
+            budgets = [0, 3, 12.5, 99, 456.7, 5000]
+            if solver == "prefix":
+                results.append(g.solve_game(valuations, budgets, mode="prefix"))
+            else:
+                results.append(g.solve_game_vectorized(valuations, budgets))
+        self.assertEqual(results[0], results[1])
+        self.assertIsInstance(results[1], list)
+        # 0.55 / 1 * 3 is 1.6500000000000001, rounded up like solve_game (np.round would give 1.6)
+        g = Game()
+        g.set_total_potion_data([["Buff", "Potion of Extreme Speed", 1]])
+        g.add_potions_to_inventory([("Potion of Extreme Speed", 1)])
+        valuations = [("Potion of Extreme Speed", 3)]
+        self.assertEqual(g.solve_game_vectorized(valuations, [0.55]), [1.7])
+        self.assertEqual(g.solve_game(valuations, [0.55], mode="prefix"), [1.7])
+
+    def test_valuation_book(self):
+        G = Game()
+        G.set_total_potion_data([
+            ["Health", "Potion of Health Regeneration", 20],
+            ["Buff", "Potion of Extreme Speed", 10],
+            ["Damage", "Potion of Deadly Poison", 45],
+            ["Health", "Potion of Instant Health", 5],
+            ["Buff", "Potion of Increased Stamina", 25],
+            ["Damage", "Potion of Untenable Odour", 1]
+        ])
+        G.add_potions_to_inventory([
+            ("Potion of Health Regeneration", 4),
+            ("Potion of Extreme Speed", 5),
+            ("Potion of Instant Health", 3),
+            ("Potion of Increased Stamina", 10),
+            ("Potion of Untenable Odour", 5),
+        ])
+        G.update_valuation("Potion of Health Regeneration", 30)
+        G.update_valuation("Potion of Extreme Speed", 15)
+        G.update_valuation("Potion of Instant Health", 15)
+        G.update_valuation("Potion of Increased Stamina", 20)
+        self.assertEqual(G.solve_valuations([12.5, 45, 80]), [37.5, 90, 142.5])
+        # Instant Health is no longer profitable, Extreme Speed now beats Health Regeneration
+        G.update_valuation("Potion of Instant Health", 4)
+        G.update_valuation("Potion of Extreme Speed", 25)
+        self.assertEqual(len(G.valuation_ranking), 2)
+        self.assertEqual(G.solve_valuations([50, 70]), [125, 155])
+        G.remove_valuation("Potion of Extreme Speed")
+        self.assertEqual(G.solve_valuations([50]), [75])
+        self.assertRaises(KeyError, G.remove_valuation, "Potion of Extreme Speed")
+        # Restocking is picked up by the next solve
+        G.add_potions_to_inventory([("Potion of Health Regeneration", 1)])
+        self.assertEqual(G.solve_valuations([50]), [30])
+
+    def test_restock_withdraw(self):
+        g = Game()
+        g.set_total_potion_data([
+            (str(x), str(x), x)
+            for x in range(1, 11)
+        ])
+        g.add_potions_to_inventory([("2", 5), ("3", 1)])
+        stock = g.stock
+        g.restock([("3", 2), ("4", 7), ("unknown", 3)])
+        # Same tree, changed in place
+        self.assertIs(g.stock, stock)
+        self.assertEqual([key for key in g.stock], [2, 3, 4])
+        self.assertEqual(g.hash_table["3"].quantity, 3)
+        self.assertEqual(g.hash_table["4"].quantity, 7)
+        g.withdraw([("2", 5), ("4", 2), ("9", 1)])
+        self.assertEqual([key for key in g.stock], [3, 4])
+        self.assertEqual(g.hash_table["2"].quantity, 0)
+        self.assertEqual(g.hash_table["4"].quantity, 5)
+        # Withdrawing more than is left sells the potion out
+        g.withdraw([("3", 10)])
+        self.assertEqual([key for key in g.stock], [4])
+        self.assertEqual(g.choose_potions_for_vendors(1), [("4", 5)])
+        # Restocking after a new catalog does not resurrect the old quantities
+        g.set_total_potion_data([
+            (str(x), str(x), x)
+            for x in range(1, 11)
+        ])
+        g.restock([("4", 1)])
+        self.assertEqual(g.hash_table["4"].quantity, 1)
+        self.assertIs(g.stock[4], g.hash_table["4"])
+
+    def test_retire_potions(self):
+        g = Game()
+        g.set_total_potion_data([(str(x), str(x), x) for x in range(1, 21)])
+        g.add_potions_to_inventory([(str(x), 2) for x in range(1, 21, 2)])
+        g.update_valuation("3", 10)
+        g.update_valuation("5", 9)
+        g.retire_potions(["3", "4"])
+        self.assertNotIn("3", g.hash_table)
+        self.assertEqual(len(g.hash_table), 18)
+        self.assertNotIn(3, [key for key in g.stock])
+        self.assertEqual(len(g.stock), 9)
+        self.assertTrue(all(g.hash_table[str(x)].buy_price == x for x in range(5, 21)))
+        # The valuation of a retired potion stays in the book but no longer counts
+        self.assertEqual(g.valuations["3"], (10, None))
+        self.assertEqual(g.solve_valuations([100]), [18])
+        self.assertRaises(KeyError, g.retire_potions, ["3"])
+
+    def test_solve_cache(self):
+        g = Game()
+        g.set_total_potion_data([
+            ["Health", "Potion of Health Regeneration", 20],
+            ["Buff", "Potion of Extreme Speed", 10],
+            ["Health", "Potion of Instant Health", 5],
+        ])
+        g.add_potions_to_inventory([
+            ("Potion of Health Regeneration", 4),
+            ("Potion of Extreme Speed", 5),
+            ("Potion of Instant Health", 3),
+        ])
+        cache = g.enable_solve_cache(maxsize=2)
+        valuations = [("Potion of Health Regeneration", 30), ("Potion of Extreme Speed", 16)]
+        first = g.solve_game(valuations, [45, 80], mode="prefix")
+        self.assertEqual(g.solve_game(list(valuations), [45, 80], mode="prefix"), first)
+        self.assertEqual(cache.statistics(), (1, 1, 1))
+        # Changing the stock makes the cached result unreachable
+        g.restock([("Potion of Health Regeneration", 1)])
+        self.assertEqual(g.solve_game(valuations, [100], mode="prefix"), [150])
+        self.assertEqual(cache.statistics(), (1, 2, 2))
+        # Least recently used result is evicted
+        g.solve_game(valuations, [1], mode="prefix")
+        self.assertEqual(len(cache), 2)
+        g.solve_game(valuations, [100], mode="prefix")
+        self.assertEqual(cache.statistics(), (2, 3, 2))
+        g.disable_solve_cache()
+        self.assertIsNone(g.solve_cache)
+
+    def test_metrics(self):
+        g = Game()
+        self.assertRaises(ValueError, g.metrics_snapshot)
+        metrics = g.enable_metrics()
+        g.set_total_potion_data([
+            ["Health", "Potion of Health Regeneration", 20],
+            ["Buff", "Potion of Extreme Speed", 10],
+            ["Health", "Potion of Instant Health", 5],
+        ])
+        g.add_potions_to_inventory([
+            ("Potion of Health Regeneration", 4),
+            ("Potion of Extreme Speed", 5),
+            ("Potion of Instant Health", 3),
+        ])
+        g.choose_potions_for_vendors(2)
+        valuations = [("Potion of Health Regeneration", 30), ("Potion of Extreme Speed", 16)]
+        self.assertEqual(g.solve_game(valuations, [45, 60], mode="kth"),
+                         g.solve_game(valuations, [45, 60], mode="prefix"))
+        snapshot = g.metrics_snapshot()
+        methods = snapshot["methods"]
+        self.assertEqual(methods["set_total_potion_data"]["items"], 3)
+        self.assertEqual(methods["add_potions_to_inventory"]["items"], 3)
+        self.assertEqual(methods["choose_potions_for_vendors"]["items"], 2)
+        self.assertEqual(methods["solve_game"]["calls"], 2)
+        self.assertEqual(methods["solve_game"]["items"], 4)
+        self.assertEqual(methods["build_profit_map"]["calls"], 2)
+        self.assertEqual(methods["solve_with_kth_largest"]["calls"], 1)
+        self.assertEqual(methods["solve_with_budget_curve"]["calls"], 1)
+        self.assertGreaterEqual(methods["solve_game"]["seconds"], methods["build_profit_map"]["seconds"])
+        self.assertEqual(snapshot["hash_table"]["count"], 3)
+        self.assertEqual(snapshot["hash_table"]["probe_max"], g.hash_table.statistics()[2])
+        # Snapshots are copies
+        g.restock([("Potion of Instant Health", 1)])
+        self.assertNotIn("restock", snapshot["methods"])
+        self.assertEqual(metrics.calls["restock"], 1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game.prom")
+            g.write_metrics(path)
+            with open(path) as f:
+                text = f.read()
+        self.assertIn('potion_game_calls_total{method="solve_game"} 2\n', text)
+        self.assertIn("potion_game_hash_table_count 3\n", text)
+        # Arguments passed by keyword are counted the same
+        g.add_potions_to_inventory(potion_name_amount_pairs=[("Potion of Extreme Speed", 5)])
+        self.assertEqual(metrics.items["add_potions_to_inventory"], 4)
+        self.assertEqual(g.solve_game(potion_valuations=valuations, starting_money=[45, 60], mode="prefix"),
+                         g.solve_game(valuations, [45, 60], "prefix"))
+        self.assertEqual(metrics.items["solve_game"], 8)
+        # A call that worked never fails because its items could not be counted
+        g.save = instrumented("save", lambda game, path: 1 // 0)(lambda game, path: path).__get__(g)
+        self.assertEqual(g.save(path="nowhere"), "nowhere")
+        self.assertEqual(metrics.items["save"], 0)
+        g.update_valuation("Potion of Instant Health", 9)
+        g.remove_valuation("Potion of Instant Health")
+        g.budget_curve(valuations)
+        g.retire_potions(["Potion of Instant Health", "Potion of Extreme Speed"])
+        self.assertEqual((metrics.calls["remove_valuation"], metrics.items["remove_valuation"]), (1, 1))
+        self.assertEqual(metrics.items["budget_curve"], 2)
+        self.assertEqual((metrics.calls["retire_potions"], metrics.items["retire_potions"]), (1, 2))
+        g.disable_metrics()
+        g.solve_game(valuations, [45])
+        self.assertEqual(metrics.calls["solve_game"], 4)
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestGame)
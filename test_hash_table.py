@@ -1,6 +1,8 @@
 import unittest
 
+import primes
 from hash_table import LinearProbePotionTable
+from potion import Potion
 
 
 class TestTable(unittest.TestCase):
@@ -13,6 +15,151 @@ class TestTable(unittest.TestCase):
         # Should at least accomodate all positions.
         self.assertGreaterEqual(len(c2.table), 100)
 
+    def test_grow(self):
+        h = LinearProbePotionTable(4)
+        # Smallest prime holding 4 potions at load factor 1/2
+        self.assertEqual(len(h.table), 11)
+        names = ["Potion of " + str(x) for x in range(200)]
+        for name in names:
+            h[name] = name
+            self.assertLessEqual(len(h), len(h.table) * 0.5)
+        self.assertEqual(len(h), 200)
+        self.assertTrue(all(h[name] == name for name in names))
+        self.assertTrue(primes.is_prime(len(h.table)))
+        # Overwriting a key does not grow the table
+        size = len(h.table)
+        for name in names:
+            h[name] = name + "!"
+        self.assertEqual(len(h.table), size)
+        self.assertEqual(h[names[7]], names[7] + "!")
+        # Statistics describe the current layout
+        self.assertLessEqual(h.statistics()[2], len(h))
+
+        fixed = LinearProbePotionTable(3, True, -1, None)
+        self.assertEqual(len(fixed.table), 3)
+        for name in names[:3]:
+            fixed[name] = name
+        self.assertRaises(ValueError, fixed.__setitem__, names[3], names[3])
+        self.assertRaises(ValueError, LinearProbePotionTable, 3, True, -1, 1.5)
+
+        # A table sized by the caller keeps its size, unless it is given a load factor too
+        sized = LinearProbePotionTable(10, True, 10)
+        for name in names[:10]:
+            sized[name] = name
+        self.assertEqual(len(sized.table), 10)
+        self.assertRaises(ValueError, sized.__setitem__, names[10], names[10])
+        growing = LinearProbePotionTable(10, True, 10, 0.5)
+        for name in names[:10]:
+            growing[name] = name
+        self.assertGreaterEqual(len(growing.table), 20)
+
+    def test_hash_codes(self):
+        h = LinearProbePotionTable(4)
+        names = ["Potion of " + str(x) for x in range(50)]
+        for name in names:
+            h[name] = name
+        self.assertEqual(sorted(h.hash_codes), sorted(names))
+        # Growing and deleting reuse the cached codes, no name is hashed again
+        saved = Potion.good_hash_code
+        Potion.good_hash_code = None
+        try:
+            h.rehash(2 * len(h.table))
+            del h[names[0]]
+            found = [h[name] for name in names[1:]]
+        finally:
+            Potion.good_hash_code = saved
+        self.assertEqual(found, names[1:])
+        self.assertNotIn(names[0], h.hash_codes)
+        self.assertEqual(len(h.hash_codes), len(h))
+        # Same positions as hashing the names again
+        for name in names[1:]:
+            self.assertEqual(h.hash(name), Potion.good_hash_code(name) % len(h.table))
+        # Missing keys are not cached
+        self.assertNotIn("Potion of nothing", h)
+        self.assertNotIn("Potion of nothing", h.hash_codes)
+
+    def test_get(self):
+        lookup = {
+            "s1": 4,
+            "s2": 4,
+            "s3": 4,
+            "s4": 4
+        }
+        h = lambda self, k: lookup[k]
+        saved = LinearProbePotionTable.hash
+        LinearProbePotionTable.hash = h
+        l = LinearProbePotionTable(10, True, 10)
+        l["s1"] = "s1"
+        l["s2"] = "s2"
+        l["s3"] = "s3"
+        before = l.statistics()[1]
+        found = l.get("s3")
+        one_probe = l.statistics()[1] - before
+        many = l.get_many(["s3", "s4", "s1"], "none")
+        missing = l.get("s4")
+        existing = l.setdefault("s2", "other")
+        inserted = l.setdefault("s4", "s4")
+        LinearProbePotionTable.hash = saved
+
+        self.assertEqual(found, "s3")
+        # s3 sits two slots after its home, one lookup walks past s1 and s2 once
+        self.assertEqual(one_probe, 2)
+        self.assertEqual(many, ["s3", "none", "s1"])
+        self.assertIsNone(missing)
+        self.assertEqual(existing, "s2")
+        self.assertEqual(inserted, "s4")
+        self.assertEqual(len(l), 4)
+
+    def test_delete(self):
+        lookup = {
+            "s1": 8,
+            "s2": 9,
+            "s3": 8,
+            "s4": 0,
+            "s5": 9,
+            "s6": 2
+        }
+        h = lambda self, k: lookup[k]
+        saved = LinearProbePotionTable.hash
+        LinearProbePotionTable.hash = h
+        # One cluster wrapping around the end of the table: s1 s2 s3 s4 s5 s6 in slots 8 9 0 1 2 3
+        l = LinearProbePotionTable(10, True, 10, None)
+        for key in ["s1", "s2", "s3", "s4", "s5", "s6"]:
+            l[key] = key
+        del l["s2"]
+        after_s2 = [item[0] if item is not None else None for item in l.table]
+        del l["s1"]
+        after_s1 = [item[0] if item is not None else None for item in l.table]
+        self.assertRaises(KeyError, l.__delitem__, "s1")
+        found = [l[key] for key in ["s3", "s4", "s5", "s6"]]
+        LinearProbePotionTable.hash = saved
+
+        # Everything after s2 moves back one slot
+        self.assertEqual(after_s2, ["s4", "s5", "s6", None, None, None, None, None, "s1", "s3"])
+        # s3 and s5 move back, s4 is already in its home slot and s6 can't move in front of it
+        self.assertEqual(after_s1, ["s4", None, "s6", None, None, None, None, None, "s3", "s5"])
+        self.assertEqual(found, ["s3", "s4", "s5", "s6"])
+        self.assertEqual(len(l), 4)
+
+    def test_delete_heavy(self):
+        h = LinearProbePotionTable(100)
+        size = len(h.table)
+        live = set()
+        for i in range(2000):
+            name = "Potion of " + str(i % 97)
+            if name in live:
+                del h[name]
+                live.remove(name)
+            else:
+                h[name] = i
+                live.add(name)
+        self.assertEqual(len(h), len(live))
+        self.assertEqual(len(h.table), size)
+        self.assertTrue(all(name in h for name in live))
+        self.assertFalse(any("Potion of " + str(i) in h for i in range(97) if "Potion of " + str(i) not in live))
+        # No slot is left behind: the table holds exactly the live entries
+        self.assertEqual(sum(1 for item in h.table if item is not None), len(live))
+
     def test_stats(self):
         # Using a dictionary in the tester file for hash table ;)
         lookup = {
@@ -1,6 +1,7 @@
 import unittest
 
-from potion import Potion
+from game import Game
+from potion import HASH_CODE_MODULUS, CompactPotion, Potion, SplitPotion
 
 
 class TestPotion(unittest.TestCase):
@@ -17,6 +18,51 @@ class TestPotion(unittest.TestCase):
         self.assertEqual(p2.buy_price, 20)
         self.assertEqual(p2.quantity, 0)
 
+    def test_compact(self):
+        for potion_class in [CompactPotion, SplitPotion]:
+            p = potion_class.create_empty("".join(["Hea", "lth"]), "Potion of Regeneration", 20)
+            self.assertEqual((p.potion_type, p.name, p.buy_price, p.quantity),
+                             ("Health", "Potion of Regeneration", 20, 0))
+            # Interned, so every potion of a type shares one string
+            self.assertIs(p.potion_type, potion_class("Health", "Potion of Haste", 3, 1).potion_type)
+            self.assertFalse(hasattr(p, "__dict__"))
+            p.quantity = 4
+            self.assertEqual(p.quantity, 4)
+        p = SplitPotion("Buff", "Potion of Extreme Speed", 40, 4)
+        self.assertRaises(AttributeError, setattr, p.spec, "buy_price", 1)
+        shared = SplitPotion.from_spec(p.spec, 2)
+        self.assertIs(shared.spec, p.spec)
+        self.assertEqual((shared.name, shared.quantity), ("Potion of Extreme Speed", 2))
+
+    def test_hash_code(self):
+        names = ["Potion of Health Regeneration", "Potion of Instant Health", "Deadly Poison", "Potion of ",
+                 "Potion of " + "z" * 40]
+        for name in names + ["z" * 2000]:
+            # The polynomial of good_hash, reduced modulo HASH_CODE_MODULUS so it never grows with the name
+            keyword = name[10:] if len(name) > 10 and name.startswith("Potion of ") else name
+            self.assertEqual(Potion.good_hash_code(name), Potion.good_hash(keyword, HASH_CODE_MODULUS))
+            self.assertLess(Potion.good_hash_code(name), 2 ** 61)
+        for name in names:
+            for tablesize in [1, 7, 69, 100, 291, 40009, 1000003]:
+                self.assertEqual(Potion.bad_hash_code(name) % tablesize, Potion.bad_hash(name, tablesize))
+
+    def test_game_with_compact_potions(self):
+        for potion_class in [CompactPotion, SplitPotion]:
+            g = Game(potion_class=potion_class)
+            g.set_total_potion_data([
+                ["Health", "Potion of Health Regeneration", 20],
+                ["Buff", "Potion of Extreme Speed", 10],
+                ["Health", "Potion of Instant Health", 5],
+            ])
+            g.add_potions_to_inventory([
+                ("Potion of Health Regeneration", 4),
+                ("Potion of Extreme Speed", 5),
+                ("Potion of Instant Health", 3),
+            ])
+            self.assertIsInstance(g.hash_table["Potion of Instant Health"], potion_class)
+            self.assertEqual(g.solve_game([("Potion of Health Regeneration", 30), ("Potion of Extreme Speed", 15),
+                                           ("Potion of Instant Health", 15)], [12.5, 45, 80]), [37.5, 90, 142.5])
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestPotion)
@@ -0,0 +1,76 @@
+import io
+import os
+import tempfile
+import unittest
+
+from game import Game
+from potion_loader import DEFAULT_SIZE_HINT, count_rows, iter_catalog, load_catalog, load_restock
+
+
+class TestPotionLoader(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.potion_data = [
+            ["Health", "Potion of Health Regeneration", 20],
+            ["Buff", "Potion of Extreme Speed", 10],
+            ["Damage", "Potion of Deadly Poison", 45],
+            ["Health", "Potion of Instant Health", 5],
+            ["Buff", "Potion of Increased Stamina", 25.5],
+            ["Damage", "Potion of Untenable Odour", 1]
+        ]
+
+    def test_csv_catalog(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.csv")
+            with open(path, "w") as f:
+                f.write("potion_type,name,buy_price\n")
+                for row in self.potion_data:
+                    f.write(",".join(str(x) for x in row) + "\n")
+            with open(path) as f:
+                self.assertEqual(count_rows(f, has_header=True), 6)
+                self.assertEqual(f.tell(), 0)
+                g = Game()
+                load_catalog(g, f, has_header=True)
+        self.assertEqual(len(g.hash_table), 6)
+        # Sized from the row count, to the first prime at load factor 1/2
+        self.assertEqual(g.hash_table.max_potions, 6)
+        self.assertEqual(len(g.hash_table.table), 13)
+        self.assertEqual(g.hash_table["Potion of Increased Stamina"].buy_price, 25.5)
+        self.assertEqual(g.hash_table["Potion of Deadly Poison"].buy_price, 45)
+
+    def test_jsonl(self):
+        catalog = io.StringIO("\n".join(
+            '{"potion_type": "%s", "name": "%s", "buy_price": %s}' % tuple(row) for row in self.potion_data))
+        self.assertEqual(list(iter_catalog(io.StringIO("[\"Buff\", \"A\", 3]\n\n"), "jsonl")), [("Buff", "A", 3)])
+        g = Game()
+        load_catalog(g, catalog, file_format="jsonl")
+        restock = io.StringIO('{"name": "Potion of Instant Health", "quantity": 3}\n'
+                              '["Potion of Health Regeneration", 4]\n'
+                              '{"name": "Potion of Instant Health", "quantity": 1}\n'
+                              '["Potion of Nothing", 4]\n')
+        load_restock(g, restock, file_format="jsonl", chunk_size=2)
+        self.assertEqual(g.hash_table["Potion of Instant Health"].quantity, 4)
+        self.assertEqual([key for key in g.stock], [5, 20])
+        self.assertRaises(ValueError, list, iter_catalog(io.StringIO(""), "xml"))
+
+    def test_generator(self):
+        # Lines that can't be counted up front, the table grows as they arrive
+        names = ["Potion of " + str(x) for x in range(10 * DEFAULT_SIZE_HINT)]
+        g = Game()
+        load_catalog(g, ("Buff," + name + "," + str(x + 1) + "\n" for x, name in enumerate(names)))
+        self.assertEqual(len(g.hash_table), len(names))
+        self.assertEqual(g.hash_table.max_potions, DEFAULT_SIZE_HINT)
+        self.assertLessEqual(len(g.hash_table), len(g.hash_table.table) / 2)
+        self.assertEqual(g.hash_table[names[-1]].buy_price, len(names))
+        # A pipe can't be rewound either
+        read_end, write_end = os.pipe()
+        with os.fdopen(write_end, "w") as f:
+            f.write("".join(",".join(str(x) for x in row) + "\n" for row in self.potion_data))
+        with os.fdopen(read_end) as f:
+            load_catalog(g, f)
+        self.assertEqual(len(g.hash_table), 6)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPotionLoader)
+    unittest.TextTestRunner(verbosity=0).run(suite)
@@ -1,6 +1,6 @@
 import unittest
 
-from primes import largest_prime
+from primes import is_prime, largest_prime, next_prime
 
 
 class TestPrimes(unittest.TestCase):
@@ -11,6 +11,13 @@ class TestPrimes(unittest.TestCase):
         for i, o in zip(inputs, outputs):
             self.assertEqual(largest_prime(i), o)
 
+    def test_next_prime(self):
+        inputs = [0, 2, 3, 20, 47, 100, 7919, 10 ** 6]
+        outputs = [2, 2, 3, 23, 47, 101, 7919, 1000003]
+        for i, o in zip(inputs, outputs):
+            self.assertEqual(next_prime(i), o)
+        self.assertEqual([x for x in range(30) if is_prime(x)], [2, 3, 5, 7, 11, 13, 17, 19, 23, 29])
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestPrimes)
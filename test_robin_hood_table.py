@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+from game import Game
+from hash_table import LinearProbePotionTable
+from robin_hood_table import RobinHoodPotionTable, displacement_statistics
+
+
+class TestRobinHoodTable(unittest.TestCase):
+
+    def test_robin_hood(self):
+        lookup = {
+            "s1": 3,
+            "s2": 3,
+            "s3": 4,
+            "s4": 3,
+            "s5": 6
+        }
+        h = lambda self, k: lookup[k]
+        saved = LinearProbePotionTable.hash
+        LinearProbePotionTable.hash = h
+        l = RobinHoodPotionTable(10, True, 10, None)
+        for key in ["s1", "s2", "s3", "s4"]:
+            l[key] = key
+        # s4 is further from home than s3 once it reaches slot 5, so it takes that slot
+        layout = [item[0] if item is not None else None for item in l.table]
+        distances = [l.distance[i] for i in range(len(l.table))]
+        statistics = l.statistics()
+        # A missing key stops at the first entry closer to its home slot than the key would be
+        missing = "s5" in l
+        found = [l[key] for key in ["s1", "s2", "s3", "s4"]]
+        del l["s1"]
+        after_delete = [item[0] if item is not None else None for item in l.table]
+        LinearProbePotionTable.hash = saved
+
+        self.assertEqual(layout, [None, None, None, "s1", "s2", "s4", "s3", None, None, None])
+        self.assertEqual(distances[3:7], [0, 1, 2, 2])
+        # s2, s3 and s4 all found their home slot taken
+        self.assertEqual(statistics[0], 3)
+        self.assertEqual(statistics[2], 2)
+        self.assertFalse(missing)
+        self.assertEqual(found, ["s1", "s2", "s3", "s4"])
+        self.assertEqual(after_delete, [None, None, None, "s2", "s4", "s3", None, None, None, None])
+
+    def test_same_interface(self):
+        names = ["Potion of " + word + " " + str(x) for x in range(60) for word in ["Haste", "Mana"]]
+        tables = [LinearProbePotionTable(4), RobinHoodPotionTable(4)]
+        for table in tables:
+            for name in names:
+                table[name] = name
+            for name in names[::3]:
+                del table[name]
+            table.setdefault("Potion of Luck", "luck")
+        self.assertEqual(len(tables[0]), len(tables[1]))
+        self.assertEqual(len(tables[0].table), len(tables[1].table))
+        for name in names + ["Potion of Luck", "Potion of Nothing"]:
+            self.assertEqual(tables[0].get(name), tables[1].get(name))
+        self.assertEqual(tables[1].get_many(names[:3], "gone"), ["gone", names[1], names[2]])
+        self.assertRaises(KeyError, tables[1].__getitem__, names[0])
+        self.assertEqual(len(tables[1].statistics()), 3)
+        # Same entries, same mean displacement, less spread
+        linear, robin_hood = displacement_statistics(tables[0]), displacement_statistics(tables[1])
+        self.assertAlmostEqual(linear[0], robin_hood[0])
+        self.assertLessEqual(robin_hood[1], linear[1])
+        self.assertLessEqual(robin_hood[2], linear[2])
+
+    def test_game(self):
+        results = []
+        for table_class in [LinearProbePotionTable, RobinHoodPotionTable]:
+            g = Game(table_class=table_class)
+            g.set_total_potion_data([(str(x), "Potion of " + str(x), x) for x in range(1, 41)])
+            g.add_potions_to_inventory([("Potion of " + str(x), x % 5 + 1) for x in range(1, 41)])
+            self.assertIsInstance(g.hash_table, table_class)
+            # Starting money up to clearing the whole stock, with both the heap and the kth solvers
+            budgets = [10, 100, 2500, 10 ** 6]
+            results.append(g.solve_game([("Potion of " + str(x), x + x % 3) for x in range(1, 41)], budgets * 5))
+            results.append(g.choose_potions_for_vendors(5))
+        self.assertEqual(results[:2], results[2:])
+
+    def test_checkpoint(self):
+        g = Game(seed=5, table_class=RobinHoodPotionTable)
+        g.set_total_potion_data([("Health", "Potion of " + str(x), x) for x in range(1, 61)])
+        g.add_potions_to_inventory([("Potion of " + str(x), 3) for x in range(1, 61, 2)])
+        g.retire_potions(["Potion of 7"])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game.bin")
+            g.save(path)
+            loaded = Game.load(path)
+        self.assertIs(loaded.table_class, RobinHoodPotionTable)
+        self.assertIsInstance(loaded.hash_table, RobinHoodPotionTable)
+        table = loaded.hash_table
+        self.assertEqual([table.distance[i] for i in range(len(table.table))],
+                         [g.hash_table.distance[i] for i in range(len(g.hash_table.table))])
+        # Lookups stop early on the restored distances, and the loaded table keeps working
+        self.assertNotIn("Potion of 7", table)
+        self.assertEqual(table["Potion of 8"].buy_price, 8)
+        for x in range(61, 200):
+            loaded.hash_table["Potion of " + str(x)] = x
+        del loaded.hash_table["Potion of 9"]
+        self.assertEqual([loaded.hash_table.get("Potion of " + str(x)) is None for x in range(1, 200)],
+                         [x in [7, 9] for x in range(1, 200)])
+        loaded.set_total_potion_data([("Health", "Potion of 1", 1)])
+        self.assertIsInstance(loaded.hash_table, RobinHoodPotionTable)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestRobinHoodTable)
+    unittest.TextTestRunner(verbosity=0).run(suite)
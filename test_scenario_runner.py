@@ -0,0 +1,29 @@
+import unittest
+
+from scenario_runner import run_scenarios
+
+
+class TestScenarioRunner(unittest.TestCase):
+
+    def test_matches_serial(self):
+        catalog = [(str(x), str(x), x) for x in range(1, 41)]
+        scenarios = [
+            {"seed": seed,
+             "days": [{"inventory": [(str(x), (x * seed) % 5 + 1) for x in range(1, 41)],
+                       "vendors": 10,
+                       "valuations": [(str(x), x + (x + seed) % 4 + x / 64) for x in range(1, 41)],
+                       "budgets": [5, 50, 500]},
+                      {"vendors": 10}]}
+            for seed in range(12)
+        ]
+        serial = run_scenarios(catalog, scenarios, max_workers=1)
+        parallel = run_scenarios(catalog, scenarios, max_workers=2, chunksize=5)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(parallel), 12)
+        # Different seeds give different vendors
+        self.assertNotEqual(parallel[0][0][1], parallel[1][0][1])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestScenarioRunner)
+    unittest.TextTestRunner(verbosity=0).run(suite)
@@ -0,0 +1,42 @@
+import unittest
+
+from game import Game
+from sensitivity import SensitivityAnalysis
+
+
+class TestSensitivity(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.types = ["Health", "Buff", "Damage"]
+        self.game = Game()
+        self.game.set_total_potion_data([(self.types[x % 3], str(x), x) for x in range(1, 61)])
+        self.game.add_potions_to_inventory([(str(x), x % 4 + 1) for x in range(1, 61)])
+        self.valuations = [(str(x), x + (x * 11) % 7 - 2) for x in range(1, 61)] + [("missing", 5)]
+        self.budgets = [0, 4, 37.5, 300, 10 ** 5]
+
+    def test_matches_solve_game(self):
+        perturbations = [{}, {"Buff": 1.1}, {"Health": 0.8, "Damage": 1.25}, {"Buff": 1.1, "Unknown": 3}]
+        matrix = self.game.solve_sensitivity(self.valuations, perturbations, self.budgets)
+        self.assertEqual(len(matrix), 4)
+        for perturbation, row in zip(perturbations, matrix):
+            perturbed = []
+            for name, price in self.valuations:
+                factor = 1
+                if name in self.game.hash_table:
+                    factor = perturbation.get(self.game.hash_table[name].potion_type, 1)
+                perturbed.append((name, price * factor))
+            self.assertEqual(row, self.game.solve_game(perturbed, self.budgets, mode="prefix"))
+        self.assertNotEqual(matrix[0], matrix[1])
+
+    def test_rankings_reused(self):
+        analysis = SensitivityAnalysis(self.game.hash_table, self.valuations)
+        self.assertEqual(sorted(analysis.categories), sorted(self.types))
+        analysis.solve([{"Buff": 1.5}, {"Buff": 2}, {"Buff": 1.5, "Health": 1}], self.budgets)
+        # The unchanged types are ranked once
+        self.assertEqual(sorted(analysis.rankings),
+                         sorted([("Buff", 1.5), ("Buff", 2), ("Damage", 1), ("Health", 1)]))
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSensitivity)
+    unittest.TextTestRunner(verbosity=0).run(suite)
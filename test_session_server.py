@@ -0,0 +1,110 @@
+import asyncio
+import json
+import unittest
+
+from session_server import SessionServer
+
+
+class TestSessionServer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = SessionServer(max_workers=2)
+        self.catalog = [
+            ["Health", "Potion of Health Regeneration", 20],
+            ["Buff", "Potion of Extreme Speed", 10],
+            ["Damage", "Potion of Deadly Poison", 45],
+            ["Health", "Potion of Instant Health", 5],
+            ["Buff", "Potion of Increased Stamina", 25],
+            ["Damage", "Potion of Untenable Odour", 1]
+        ]
+        self.inventory = [
+            ["Potion of Health Regeneration", 4],
+            ["Potion of Extreme Speed", 5],
+            ["Potion of Instant Health", 3],
+            ["Potion of Increased Stamina", 10],
+            ["Potion of Untenable Odour", 5],
+        ]
+        self.valuations = [
+            ["Potion of Health Regeneration", 30],
+            ["Potion of Extreme Speed", 15],
+            ["Potion of Instant Health", 15],
+            ["Potion of Increased Stamina", 20],
+        ]
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+
+    def session_commands(self, session: str) -> list:
+        return [
+            {"id": session + "1", "session": session, "op": "create", "args": [0]},
+            {"id": session + "2", "session": session, "op": "set_total_potion_data", "args": [self.catalog]},
+            {"id": session + "3", "session": session, "op": "add_potions_to_inventory", "args": [self.inventory]},
+            {"id": session + "4", "session": session, "op": "solve_game", "args": [self.valuations, [12.5, 45, 80]]},
+            {"id": session + "5", "session": session, "op": "choose_potions_for_vendors", "args": [2]},
+        ]
+
+    def test_sessions_keep_order(self):
+        async def run() -> list:
+            commands = []
+            # Interleave two sessions, each one has to see its own commands in order
+            for a, b in zip(self.session_commands("a"), self.session_commands("b")):
+                commands += [a, b]
+            return await asyncio.gather(*[self.server.handle(command) for command in commands])
+
+        responses = asyncio.run(run())
+        self.assertTrue(all("error" not in response for response in responses))
+        by_id = {response["id"]: response["result"] for response in responses}
+        self.assertEqual(by_id["a4"], [37.5, 90, 142.5])
+        self.assertEqual(by_id["a5"], by_id["b5"])
+        self.assertEqual(len(self.server.sessions), 2)
+
+    def test_close_and_create_again(self):
+        async def run() -> list:
+            commands = self.session_commands("a")[:3] + [{"id": "close", "session": "a", "op": "close"}]
+            # Same id again, queued behind the commands of the closed session
+            commands += [dict(command, id="again" + command["id"]) for command in self.session_commands("a")]
+            commands += [{"id": "ghost", "session": "ghost", "op": "solve_game", "args": [[], [1]]},
+                         {"id": "ghost close", "session": "ghost", "op": "close"}]
+            responses = await asyncio.gather(*[self.server.handle(command) for command in commands])
+            self.assertEqual(list(self.server.locks), ["a"])
+            responses.append(await self.server.handle({"id": "last", "session": "a", "op": "close"}))
+            return responses
+
+        responses = asyncio.run(run())
+        errors = [response["id"] for response in responses if "error" in response]
+        self.assertEqual(errors, ["ghost", "ghost close"])
+        by_id = {response["id"]: response.get("result") for response in responses}
+        self.assertEqual(by_id["againa4"], [37.5, 90, 142.5])
+        # Unknown sessions never get a lock, closed ones drop theirs once nothing waits for it
+        self.assertEqual(self.server.locks, {})
+        self.assertEqual(self.server.waiting, {})
+        self.assertEqual(self.server.sessions, {})
+
+    def test_stream(self):
+        async def run() -> list:
+            reader = asyncio.StreamReader()
+            lines = [json.dumps(command) for command in self.session_commands("a")]
+            lines += ["not json", json.dumps({"id": 6, "session": "a", "op": "draw"}),
+                      json.dumps({"id": 7, "session": "z", "op": "solve_game", "args": [[], []]}),
+                      json.dumps({"id": 8, "session": "a", "op": "close"}),
+                      "5", "[]", json.dumps({"id": 9, "session": ["a"], "op": "create"})]
+            reader.feed_data(("\n".join(lines) + "\n").encode())
+            reader.feed_eof()
+            output = []
+            await self.server.serve_stream(reader, output.append)
+            return [json.loads(line) for line in output]
+
+        responses = asyncio.run(run())
+        self.assertEqual(len(responses), 12)
+        session_a = [response["id"] for response in responses if response["id"] in ["a1", "a2", "a3", "a4", "a5", 6, 8]]
+        self.assertEqual(session_a, ["a1", "a2", "a3", "a4", "a5", 6, 8])
+        errors = {response["id"]: response["error"] for response in responses if "error" in response}
+        self.assertEqual(sorted(errors, key=str), [6, 7, 9, None])
+        self.assertEqual(len([response for response in responses if response["id"] is None]), 3)
+        self.assertIn("TypeError", errors[9])
+        self.assertEqual(self.server.sessions, {})
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSessionServer)
+    unittest.TextTestRunner(verbosity=0).run(suite)